@@ -0,0 +1,173 @@
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, func, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.responses import ORJSONResponse, rows_to_dicts
+from app.models.plant_scan import PlantScan
+from app.models.scan_rollup import ScanDailyRollup
+from app.ml.model_loader import get_model_version
+from app.models.user import Farmer
+from app.services.accuracy_monitor import get_accuracy_monitor
+from app.services.drift_monitor import get_drift_monitor, ALL_REGIONS
+from app.services.scan_archive import get_scan_archive, hot_cutoff
+from app.utils.geo import bounding_box, covering_cells, haversine_km, prefix_ranges
+
+router = APIRouter()
+
+ROLLUP_DIMENSIONS = {
+    "day": ScanDailyRollup.day,
+    "disease": ScanDailyRollup.disease,
+    "plant_type": ScanDailyRollup.plant_type,
+    "region": ScanDailyRollup.region
+}
+
+@router.get("/outbreaks")
+async def disease_outbreaks(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    disease: Optional[str] = None,
+    plant_type: Optional[str] = None,
+    region: Optional[str] = None,
+    group_by: str = Query("day,disease,region", description="Comma-separated: day, disease, plant_type, region"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Scan counts from the daily rollup table, summed over the requested
+    dimensions. Defaults to the last 30 days.
+    """
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    unknown = [d for d in dimensions if d not in ROLLUP_DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by dimension: {', '.join(unknown)}")
+
+    end = end or date.today()
+    start = start or end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    columns = [ROLLUP_DIMENSIONS[d] for d in dimensions]
+    query = (
+        select(*columns, func.sum(ScanDailyRollup.scan_count).label("scan_count"))
+        .where(ScanDailyRollup.day >= start, ScanDailyRollup.day <= end)
+    )
+    if disease is not None:
+        query = query.where(ScanDailyRollup.disease == disease)
+    if plant_type is not None:
+        query = query.where(ScanDailyRollup.plant_type == plant_type)
+    if region is not None:
+        query = query.where(ScanDailyRollup.region == region)
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+
+    rows = (await db.execute(query)).all()
+    return ORJSONResponse({
+        "start": start,
+        "end": end,
+        "group_by": dimensions,
+        "rows": rows_to_dicts(dimensions + ["scan_count"], rows)
+    })
+
+@router.get("/nearby")
+async def nearby_diseases(
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    farmer_id: Optional[str] = None,
+    radius_km: float = Query(20.0, gt=0, le=500),
+    days: int = Query(14, ge=1, le=365),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Diseases detected within `radius_km` of a point (or a farmer's saved
+    location) in the last `days` days.
+
+    Candidate scans come from index range scans over the geohash prefixes
+    covering the circle; exact distances are then checked on those rows.
+    Windows reaching past the hot table also read the Parquet archive.
+    """
+    if latitude is None or longitude is None:
+        if farmer_id is None:
+            raise HTTPException(status_code=400, detail="Pass latitude and longitude, or farmer_id")
+        farmer = await db.get(Farmer, farmer_id)
+        if not farmer:
+            raise HTTPException(status_code=404, detail="Farmer not found")
+        if farmer.latitude is None or farmer.longitude is None:
+            raise HTTPException(status_code=400, detail="Farmer has no saved coordinates")
+        latitude, longitude = farmer.latitude, farmer.longitude
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, radius_km)
+
+    ranges = prefix_ranges(covering_cells(latitude, longitude, radius_km))
+    selects = []
+    for low, high in ranges:
+        query = (
+            select(PlantScan.id, PlantScan.disease_predicted, PlantScan.latitude, PlantScan.longitude)
+            .where(PlantScan.geohash >= low, PlantScan.created_at >= since)
+            .where(PlantScan.latitude.between(lat_min, lat_max), PlantScan.longitude.between(lon_min, lon_max))
+        )
+        if high is not None:
+            query = query.where(PlantScan.geohash < high)
+        selects.append(query)
+
+    rows = (await db.execute(union_all(*selects) if len(selects) > 1 else selects[0])).all()
+    if since < hot_cutoff():
+        archived = await run_in_threadpool(
+            get_scan_archive().nearby, since, ranges, (lat_min, lat_max, lon_min, lon_max)
+        )
+        # A scan can sit in both places if archival stopped between writing and deleting
+        seen = {row.id for row in rows}
+        rows += [row for row in archived if row[0] not in seen]
+
+    counts = Counter(
+        disease for _, disease, lat, lon in rows
+        if haversine_km(latitude, longitude, lat, lon) <= radius_km
+    )
+    return ORJSONResponse({
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius_km": radius_km,
+        "days": days,
+        "total_scans": sum(counts.values()),
+        "diseases": [{"disease": d, "scan_count": n} for d, n in counts.most_common()]
+    })
+
+@router.get("/accuracy")
+async def model_accuracy(
+    model_version: Optional[str] = Query(None, description="Defaults to the loaded model; 'all' sums every version"),
+    region: Optional[str] = None
+):
+    """
+    Confusion matrix and per-class precision/recall from farmer feedback,
+    served from incrementally maintained counts.
+    """
+    monitor = get_accuracy_monitor()
+    if model_version is None:
+        model_version = get_model_version() or ""
+    report = monitor.report(None if model_version == "all" else model_version, region)
+    report["model_versions"] = monitor.model_versions()
+    return ORJSONResponse(report)
+
+@router.get("/drift")
+async def input_drift(
+    region: Optional[str] = Query(None, description="Geohash cell from the latest report; omit for all regions"),
+    histograms: bool = False
+):
+    """
+    Latest input drift check: per-feature PSI of recent scans against the
+    reference windows, per region. The "" region covers every scan.
+    """
+    monitor = get_drift_monitor()
+    report = monitor.report
+    if region is not None:
+        if region not in report["regions"]:
+            raise HTTPException(status_code=404, detail="No drift data for this region")
+        report = {**report, "regions": {region: report["regions"][region]}}
+    if histograms:
+        report = {**report, "histograms": monitor.histograms(region if region is not None else ALL_REGIONS)}
+    return ORJSONResponse(report)
\ No newline at end of file
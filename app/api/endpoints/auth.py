@@ -1,13 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from app.core.database import get_db
-from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.schemas.user import Token, FarmerCreate, FarmerResponse
+from app.core.database import get_async_db
+from app.core.security import (
+    create_access_token, get_password_hash_async, verify_and_update_password, verify_token, revoke_farmer_tokens,
+    ACCESS_TOKEN_EXPIRE_MINUTES
+)
+from app.schemas.user import Token, FarmerCreate, FarmerResponse, LoginRequest
 from app.models.user import Farmer
+from app.services.auth_service import AsyncAuthService
 
 router = APIRouter()
+bearer = HTTPBearer()
+
+def _check_active(farmer: Farmer):
+    if farmer.is_active is False:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is deactivated")
 
 # Mock user data for development
 MOCK_FARMERS = {
@@ -15,12 +25,12 @@ MOCK_FARMERS = {
 }
 
 @router.post("/register", response_model=FarmerResponse)
-async def register_farmer(farmer_data: FarmerCreate, db: Session = Depends(get_db)):
+async def register_farmer(farmer_data: FarmerCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new farmer (mock implementation)
     """
     # Check if farmer already exists
-    existing_farmer = db.query(Farmer).filter(Farmer.phone == farmer_data.phone).first()
+    existing_farmer = await AsyncAuthService.get_farmer_by_phone(db, farmer_data.phone)
     if existing_farmer:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,26 +44,40 @@ async def register_farmer(farmer_data: FarmerCreate, db: Session = Depends(get_d
         language=farmer_data.language,
         location=farmer_data.location
     )
+    if farmer_data.password:
+        new_farmer.hashed_password = await get_password_hash_async(farmer_data.password)
     
     db.add(new_farmer)
-    db.commit()
-    db.refresh(new_farmer)
+    await db.commit()
+    await db.refresh(new_farmer)
     
     return new_farmer
 
 @router.post("/login", response_model=Token)
-async def login(phone: str, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Login farmer (mock implementation - in production, add OTP verification)
+    
+    Credentials go in the JSON body so passwords stay out of URLs and access
+    logs. Farmers who registered with a password must send it.
     """
-    # Find farmer by phone
-    farmer = db.query(Farmer).filter(Farmer.phone == phone).first()
-    if not farmer:
-        # For development, create farmer if not exists
-        farmer = Farmer(phone=phone, name="Demo Farmer")
-        db.add(farmer)
-        db.commit()
-        db.refresh(farmer)
+    # Find farmer by phone; for development, create farmer if not exists
+    farmer = await AsyncAuthService.get_or_create_farmer(
+        db, credentials.phone, name="Demo Farmer", is_verified=False
+    )
+    _check_active(farmer)
+    
+    if farmer.hashed_password:
+        verified, new_hash = await verify_and_update_password(credentials.password or "", farmer.hashed_password)
+        if not verified:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect phone or password"
+            )
+        if new_hash:
+            # Stored with an older work factor; upgrade while we have the plaintext
+            farmer.hashed_password = new_hash
+            await db.commit()
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -67,6 +91,18 @@ async def login(phone: str, db: Session = Depends(get_db)):
         token_type="bearer"
     )
 
+@router.post("/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(bearer),
+                 db: AsyncSession = Depends(get_async_db)):
+    """
+    Sign the farmer out everywhere: every token issued to them so far is
+    refused from now on
+    """
+    payload = await verify_token(credentials.credentials, db)
+    farmer = await db.get(Farmer, payload["sub"])
+    await revoke_farmer_tokens(db, farmer)
+    return {"message": "Logged out successfully"}
+
 @router.post("/send-otp")
 async def send_otp(phone: str):
     """
@@ -80,7 +116,7 @@ async def send_otp(phone: str):
     }
 
 @router.post("/verify-otp", response_model=Token)
-async def verify_otp(phone: str, otp: str, db: Session = Depends(get_db)):
+async def verify_otp(phone: str, otp: str, db: AsyncSession = Depends(get_async_db)):
     """
     Verify OTP and login farmer (mock implementation)
     """
@@ -92,15 +128,8 @@ async def verify_otp(phone: str, otp: str, db: Session = Depends(get_db)):
         )
     
     # Find or create farmer
-    farmer = db.query(Farmer).filter(Farmer.phone == phone).first()
-    if not farmer:
-        farmer = Farmer(phone=phone, name="New Farmer", is_verified=True)
-        db.add(farmer)
-        db.commit()
-        db.refresh(farmer)
-    else:
-        farmer.is_verified = True
-        db.commit()
+    farmer = await AsyncAuthService.get_or_create_farmer(db, phone)
+    _check_active(farmer)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
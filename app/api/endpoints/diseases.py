@@ -0,0 +1,33 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.http_cache import get_precomputed_response
+from app.services.disease_catalog import get_disease_catalog, catalog_response_name
+
+router = APIRouter()
+
+@router.get("/")
+async def list_diseases(request: Request, language: Optional[str] = None):
+    """
+    Full disease catalog in one language, served from a precomputed body
+    with an ETag
+    """
+    catalog = get_disease_catalog()
+    response = get_precomputed_response(catalog_response_name(language or catalog.default_language))
+    if response is None:
+        response = get_precomputed_response(catalog_response_name(catalog.default_language))
+    if response is None:
+        raise HTTPException(status_code=503, detail="Disease catalog not loaded")
+    return response.respond(request)
+
+@router.get("/{name}")
+async def get_disease(name: str, language: Optional[str] = None):
+    """
+    Catalog entry for any spelling of a model class name (e.g.
+    Tomato_Bacterial_spot or Tomato___Bacterial_spot)
+    """
+    fragment = get_disease_catalog().get_fragment(name, language)
+    if fragment is None:
+        raise HTTPException(status_code=404, detail="Disease not found")
+    return Response(content=fragment, media_type="application/json")
\ No newline at end of file
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.metrics import record_upload
+from app.core.tracing import span
+from app.models.plant_scan import PlantScan
+from app.services.job_queue import get_job_queue, JOB_SUCCEEDED
+
+router = APIRouter()
+
+@router.post("/predict", status_code=status.HTTP_202_ACCEPTED)
+async def submit_prediction_job(
+    file: UploadFile = File(...),
+    farmer_id: str = Form(...),
+    priority: int = Form(0),
+    latitude: Optional[float] = Form(None, ge=-90, le=90),
+    longitude: Optional[float] = Form(None, ge=-180, le=180)
+):
+    """
+    Queue an image for prediction and return a job ID immediately
+    """
+    if not file.content_type.startswith('image/'):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    with span("upload.read", filename=file.filename):
+        contents = await file.read()
+    record_upload("jobs", len(contents))
+    if len(contents) > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    with span("job_queue.enqueue"):
+        job_id = await run_in_threadpool(
+            get_job_queue().enqueue, contents, farmer_id, file.filename, priority, latitude, longitude
+        )
+
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/{job_id}")
+async def get_prediction_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get job status, including the scan once the job has succeeded
+    """
+    job = await run_in_threadpool(get_job_queue().get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job["status"] == JOB_SUCCEEDED and job["scan_id"]:
+        scan = await db.get(PlantScan, job["scan_id"])
+        job["scan"] = scan.to_dict() if scan else None
+
+    return job
\ No newline at end of file
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from PIL import Image
+from typing import Optional, Dict, Any
+import asyncio
+import io
+import logging
+
+from app.core.config import settings
+from app.ml.inference import get_inference_executor
+from app.ml.model_loader import get_predictor
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+class LiveScanState:
+    """
+    Per-connection state for live scanning.
+
+    Only the most recent frame is kept; a frame that arrives while another is
+    waiting replaces it. An idle connection holds no frame and no task.
+    """
+    __slots__ = (
+        "latest_frame", "worker", "min_interval", "last_inference_at",
+        "frames_received", "frames_dropped", "predictions_sent"
+    )
+
+    def __init__(self, min_interval: float):
+        self.latest_frame: Optional[bytes] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.min_interval = min_interval
+        self.last_inference_at = 0.0
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.predictions_sent = 0
+
+def _predict_frame(frame: bytes) -> Dict[str, Any]:
+    """Decode a compressed frame and run prediction (runs on the inference thread)"""
+    image = Image.open(io.BytesIO(frame))
+    image.load()
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return get_predictor().predict(image)
+
+async def _drain_frames(websocket: WebSocket, state: LiveScanState):
+    """Predict on the latest frame, respecting the per-connection frame rate"""
+    loop = asyncio.get_running_loop()
+    executor = get_inference_executor()
+
+    while state.latest_frame is not None:
+        # Rate limit: frames arriving during the wait replace the pending one
+        wait = state.last_inference_at + state.min_interval - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        frame, state.latest_frame = state.latest_frame, None
+        state.last_inference_at = loop.time()
+        seq = state.frames_received
+
+        try:
+            result = await executor.run(_predict_frame, frame)
+        except Exception as e:
+            await websocket.send_json({"type": "error", "frame": seq, "detail": str(e)})
+            continue
+
+        state.predictions_sent += 1
+        await websocket.send_json({
+            "type": "prediction",
+            "frame": seq,
+            "predicted_disease": result["predicted_disease"],
+            "predicted_plant": result["predicted_plant"],
+            "confidence": result["confidence"],
+            "is_healthy": result["is_healthy"],
+            "top_predictions": result["top_predictions"],
+            "frames_dropped": state.frames_dropped
+        })
+
+@router.websocket("/live")
+async def live_scan(websocket: WebSocket, fps: Optional[float] = None):
+    """
+    Live camera scanning.
+
+    The client sends compressed (JPEG/PNG) frames as binary messages and
+    receives predictions for the most recent frame, at most `fps` per second.
+    """
+    await websocket.accept()
+
+    max_fps = settings.LIVE_SCAN_MAX_FPS
+    effective_fps = min(fps, max_fps) if fps and fps > 0 else max_fps
+    state = LiveScanState(min_interval=1.0 / effective_fps)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            frame = message.get("bytes")
+            if not frame:
+                # Text messages are ignored; frames must be sent as binary
+                continue
+
+            if len(frame) > settings.LIVE_SCAN_MAX_FRAME_BYTES:
+                await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG)
+                break
+
+            state.frames_received += 1
+            if state.latest_frame is not None:
+                state.frames_dropped += 1
+            state.latest_frame = frame
+
+            if state.worker is None or state.worker.done():
+                state.worker = asyncio.create_task(_drain_frames(websocket, state))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        state.latest_frame = None
+        if state.worker is not None:
+            if state.worker.done():
+                if not state.worker.cancelled() and state.worker.exception():
+                    logger.debug(f"Live scan worker ended with: {state.worker.exception()}")
+            else:
+                state.worker.cancel()
+        logger.info(
+            f"Live scan closed: {state.frames_received} frames, "
+            f"{state.frames_dropped} dropped, {state.predictions_sent} predictions"
+        )
\ No newline at end of file
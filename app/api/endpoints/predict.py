@@ -0,0 +1,65 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.metrics import record_upload
+from app.core.responses import ORJSONResponse
+from app.core.tracing import span
+from app.ml.inference import get_inference_executor
+from app.ml.model_loader import get_predictor, is_model_loaded
+from app.services.disease_catalog import get_disease_catalog
+from app.services.drift_monitor import get_drift_monitor
+from app.utils.image_processing import decode_raw_tensor, RAW_TENSOR_CONTENT_TYPE, RAW_TENSOR_HEADER
+
+router = APIRouter()
+
+def _predict_raw(payload: bytes):
+    """Validate a raw tensor payload and run prediction (runs on the inference thread)"""
+    predictor = get_predictor()
+    pixels = decode_raw_tensor(payload, predictor.input_size)
+    return predictor.predict_tensor(pixels)
+
+@router.post("/raw")
+async def predict_raw_tensor(request: Request, language: Optional[str] = None):
+    """
+    Predict from pixels the client already resized to the model input size.
+
+    Body: PDRT header (magic, version, dtype, width, height) followed by
+    height * width * 3 bytes of uint8 RGB, sent as application/x-plantdoc-tensor.
+    The response includes the catalog entry for the predicted disease in
+    `language`, if the catalog has one.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type != RAW_TENSOR_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Content type must be {RAW_TENSOR_CONTENT_TYPE}")
+
+    # Never load the model on the event loop; readiness reports it until it is up
+    if not is_model_loaded():
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    # Reject oversized bodies before reading them
+    height, width = get_predictor().input_size
+    expected_length = RAW_TENSOR_HEADER.size + height * width * 3
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) != expected_length:
+        raise HTTPException(status_code=400, detail=f"Raw tensor payload must be {expected_length} bytes")
+
+    # Chunked uploads have no content-length, so stop reading once the body is too long
+    with span("upload.read", format="raw_tensor"):
+        chunks, received = [], 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > expected_length:
+                raise HTTPException(status_code=413, detail=f"Raw tensor payload must be {expected_length} bytes")
+            chunks.append(chunk)
+        payload = b"".join(chunks)
+    record_upload("predict_raw", len(payload))
+
+    try:
+        result = await get_inference_executor().run(_predict_raw, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    get_drift_monitor().observe(result)
+
+    result["disease_info"] = get_disease_catalog().get_entry(result["predicted_disease"], language)
+    return ORJSONResponse(result)
\ No newline at end of file
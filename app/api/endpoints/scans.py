@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import ORJSONResponse, rows_to_dicts
+from app.models.plant_scan import PlantScan
+from app.schemas.plant_scan import PlantScanUpdate
+from app.services.scan_archive import get_scan_archive
+
+router = APIRouter()
+
+# Columns shown in the history list, serialized straight from row tuples
+SCAN_LIST_COLUMNS = (
+    PlantScan.id, PlantScan.created_at, PlantScan.disease_predicted,
+    PlantScan.confidence, PlantScan.plant_type, PlantScan.severity, PlantScan.image_url
+)
+
+@router.get("/farmer/{farmer_id}")
+async def list_farmer_scans(
+    farmer_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    A farmer's scan history, newest first.
+
+    Pass `next_cursor` from the previous page as `cursor` to continue. Each
+    page is a range scan on (farmer_id, created_at, id), so deep pages cost
+    the same as the first one. Once the hot table runs out, paging continues
+    into archived scans.
+    """
+    query = select(*SCAN_LIST_COLUMNS).where(PlantScan.farmer_id == farmer_id)
+    before = None
+    if cursor:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(PlantScan.created_at, PlantScan.id) < tuple_(*before))
+
+    query = query.order_by(PlantScan.created_at.desc(), PlantScan.id.desc()).limit(limit + 1)
+    rows = list((await db.execute(query)).all())
+
+    archive = get_scan_archive()
+    if len(rows) <= limit and archive.has_data():
+        if rows:
+            before = (rows[-1].created_at, rows[-1].id)
+        columns = [c.key for c in SCAN_LIST_COLUMNS]
+        archived = await run_in_threadpool(archive.farmer_history, farmer_id, columns, limit + 1, before)
+        # A scan can sit in both places if archival stopped between writing and deleting
+        seen = {row.id for row in rows}
+        rows += [tuple(scan[c] for c in columns) for scan in archived if scan["id"] not in seen]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = dict(zip([c.key for c in SCAN_LIST_COLUMNS], rows[-1]))
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return ORJSONResponse({
+        "scans": rows_to_dicts([c.key for c in SCAN_LIST_COLUMNS], rows),
+        "next_cursor": next_cursor,
+        "limit": limit
+    })
+
+@router.patch("/{scan_id}/feedback")
+async def submit_scan_feedback(
+    scan_id: str,
+    feedback: PlantScanUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Record a farmer's feedback on a scan. Confusion counts for the model that
+    made the prediction are updated in the same transaction.
+    """
+    db.info["use_writer"] = True
+    scan = await db.get(PlantScan, scan_id)
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    if feedback.is_correct_prediction is False and not (feedback.actual_disease or scan.actual_disease):
+        raise HTTPException(status_code=400, detail="actual_disease is required when the prediction is wrong")
+
+    for field, value in feedback.dict(exclude_unset=True).items():
+        setattr(scan, field, value)
+    if feedback.is_correct_prediction:
+        scan.actual_disease = None
+    scan.feedback_provided_at = datetime.now(timezone.utc)
+
+    await db.commit()
+    await db.refresh(scan)
+    return ORJSONResponse(scan.to_dict())
\ No newline at end of file
@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import ORJSONResponse, rows_to_dicts
 from app.models.user import Farmer
 from app.schemas.user import FarmerResponse, FarmerUpdate
+from app.services.auth_service import AsyncAuthService
+from app.services.farmer_stats import get_farmer_counter
 
 router = APIRouter()
 
+# Columns returned by list endpoints, serialized straight from row tuples
+FARMER_LIST_COLUMNS = (
+    Farmer.id, Farmer.phone, Farmer.name, Farmer.language, Farmer.location,
+    Farmer.is_verified, Farmer.created_at, Farmer.updated_at
+)
+
 @router.get("/me", response_model=FarmerResponse)
-async def get_current_user(farmer_id: str = "1", db: Session = Depends(get_db)):
+async def get_current_user(farmer_id: str = "1", db: AsyncSession = Depends(get_async_db)):
     """
     Get current farmer profile (mock implementation)
     """
-    farmer = db.query(Farmer).filter(Farmer.id == farmer_id).first()
+    farmer = await AsyncAuthService.get_farmer_by_id(db, farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
     
@@ -22,12 +35,12 @@ async def get_current_user(farmer_id: str = "1", db: Session = Depends(get_db)):
 async def update_current_user(
     farmer_update: FarmerUpdate, 
     farmer_id: str = "1", 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update current farmer profile (mock implementation)
     """
-    farmer = db.query(Farmer).filter(Farmer.id == farmer_id).first()
+    farmer = await AsyncAuthService.get_farmer_by_id(db, farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
     
@@ -39,33 +52,64 @@ async def update_current_user(
     if farmer_update.location is not None:
         farmer.location = farmer_update.location
     
-    db.commit()
-    db.refresh(farmer)
+    await db.commit()
+    await db.refresh(farmer)
     
     return farmer
 
 @router.get("/{farmer_id}", response_model=FarmerResponse)
-async def get_farmer(farmer_id: str, db: Session = Depends(get_db)):
+async def get_farmer(farmer_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get farmer by ID (for development)
     """
-    farmer = db.query(Farmer).filter(Farmer.id == farmer_id).first()
+    farmer = await AsyncAuthService.get_farmer_by_id(db, farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
     
     return farmer
 
 @router.get("/")
-async def list_farmers(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+async def list_farmers(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    language: Optional[str] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    List all farmers (for development)
+    List farmers, oldest first, optionally filtered by language or location.
+
+    Pass `next_cursor` from the previous page as `cursor` to continue. `total`
+    is a cached count of all farmers and is only returned without filters.
     """
-    farmers = db.query(Farmer).offset(skip).limit(limit).all()
-    total = db.query(Farmer).count()
-    
-    return {
-        "farmers": farmers,
-        "total": total,
-        "skip": skip,
+    query = select(*FARMER_LIST_COLUMNS)
+    if language is not None:
+        query = query.where(Farmer.language == language)
+    if state is not None:
+        query = query.where(Farmer.location_state == state)
+    if district is not None:
+        query = query.where(Farmer.location_district == district)
+    if cursor:
+        try:
+            created_at, farmer_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(Farmer.created_at, Farmer.id) > tuple_(created_at, farmer_id))
+
+    query = query.order_by(Farmer.created_at, Farmer.id).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    filtered = language is not None or state is not None or district is not None
+    return ORJSONResponse({
+        "farmers": rows_to_dicts([c.key for c in FARMER_LIST_COLUMNS], rows),
+        "total": None if filtered else get_farmer_counter().total,
+        "next_cursor": next_cursor,
         "limit": limit
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -0,0 +1,185 @@
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Optional, Sequence, Tuple
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry, GaugeFunc, CounterFunc
+from app.ml.inference import InferenceExecutor, get_inference_executor
+
+# Request priorities
+PRIORITY_CRITICAL = "critical"  # never shed (health, auth, metrics)
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"  # shed first when the SLO is breached
+
+class LatencyTracker:
+    """
+    Fixed-size ring buffer of recent request latencies.
+
+    The p95 is recomputed at most once per `refresh_interval`, so reading it is
+    cheap. It reads as 0 once no request has finished for `stale_after`
+    seconds, so shedding cannot outlive the traffic that caused it.
+    """
+
+    def __init__(self, size: int = 512, refresh_interval: float = 0.5, stale_after: float = 10.0):
+        self._samples = array("d", [0.0] * size)
+        self._size = size
+        self._count = 0
+        self._lock = threading.Lock()
+        self._refresh_interval = refresh_interval
+        self._next_refresh = 0.0
+        self._stale_after = stale_after
+        self._last_record = 0.0
+        self._p95 = 0.0
+
+    @property
+    def p95(self) -> float:
+        if time.monotonic() - self._last_record > self._stale_after:
+            return 0.0
+        return self._p95
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples[self._count % self._size] = seconds
+            self._count += 1
+            now = time.monotonic()
+            self._last_record = now
+            if now < self._next_refresh:
+                return
+            self._next_refresh = now + self._refresh_interval
+            filled = sorted(self._samples[:min(self._count, self._size)])
+        self._p95 = filled[int(len(filled) * 0.95) - 1] if len(filled) >= 20 else 0.0
+
+class AdmissionController:
+    """
+    Decide whether to admit a request based on in-flight requests,
+    inference queue depth and recent p95 latency.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_in_flight: int, max_queue_depth: int,
+                 latency_slo: float, critical_paths: Sequence[str], low_priority_paths: Sequence[str]):
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.max_queue_depth = max_queue_depth
+        self.latency_slo = latency_slo
+        self.critical_paths = tuple(critical_paths)
+        self.low_priority_paths = tuple(low_priority_paths)
+        self.latency = LatencyTracker()
+        self.in_flight = 0
+        self.decisions: Counter = Counter()  # (priority, outcome) -> count
+
+    def classify(self, path: str) -> str:
+        """Map a request path to a priority"""
+        if path.startswith(self.critical_paths):
+            return PRIORITY_CRITICAL
+        if path.startswith(self.low_priority_paths):
+            return PRIORITY_LOW
+        return PRIORITY_NORMAL
+
+    def decide(self, priority: str) -> Optional[Tuple[int, str]]:
+        """Return None to admit, or (status_code, reason) to shed"""
+        if priority == PRIORITY_CRITICAL:
+            return None
+
+        if self.in_flight >= self.max_in_flight:
+            return 429, "too_many_requests"
+
+        queue_depth = self.executor.queue_depth
+        if queue_depth >= self.max_queue_depth:
+            return 503, "inference_queue_full"
+
+        if self.latency.p95 > self.latency_slo:
+            # Over the SLO: drop bulk traffic, and normal traffic once inference is backing up
+            if priority == PRIORITY_LOW or queue_depth >= self.max_queue_depth // 2:
+                return 503, "latency_slo_breached"
+
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        """Current inputs and decision counts"""
+        return {
+            "in_flight": self.in_flight,
+            "inference_queue_depth": self.executor.queue_depth,
+            "latency_p95": self.latency.p95,
+            "decisions": {f"{p}:{o}": n for (p, o), n in self.decisions.items()}
+        }
+
+class AdmissionMiddleware:
+    """
+    Shed excess HTTP load with 429/503 and Retry-After before it reaches a
+    handler. Critical paths are always admitted.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, retry_after: int = 2):
+        self.app = app
+        self.controller = controller
+        self.retry_after = str(retry_after).encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        priority = controller.classify(scope["path"])
+        decision = controller.decide(priority)
+
+        if decision is not None:
+            status_code, reason = decision
+            controller.decisions[(priority, reason)] += 1
+            body = orjson.dumps({"detail": "Server is overloaded, please retry", "reason": reason})
+            await send({
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", self.retry_after)
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        controller.decisions[(priority, "admitted")] += 1
+        if priority == PRIORITY_CRITICAL:
+            await self.app(scope, receive, send)
+            return
+
+        controller.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.in_flight -= 1
+            controller.latency.record(time.perf_counter() - started)
+
+# Global instance
+_admission_controller = AdmissionController(
+    get_inference_executor(),
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    latency_slo=settings.ADMISSION_LATENCY_SLO,
+    critical_paths=settings.ADMISSION_CRITICAL_PATHS,
+    low_priority_paths=settings.ADMISSION_LOW_PRIORITY_PATHS
+)
+
+registry.register(CounterFunc(
+    "admission_decisions_total", "Admission decisions by priority and outcome",
+    lambda: dict(_admission_controller.decisions), ("priority", "outcome")
+))
+registry.register(GaugeFunc(
+    "admission_in_flight", "Non-critical requests currently being handled",
+    lambda: _admission_controller.in_flight
+))
+registry.register(GaugeFunc(
+    "admission_latency_p95_seconds", "Recent p95 latency used for admission decisions",
+    lambda: _admission_controller.latency.p95
+))
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller"""
+    return _admission_controller
\ No newline at end of file
@@ -13,14 +13,28 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     RELOAD: bool = True
+    WORKERS: int = 2  # worker processes started by app.launcher
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./plant_doctor.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # derived from DATABASE_URL (aiosqlite/asyncpg) if unset
+    
+    # SQLite Tuning (file-backed SQLite only)
+    SQLITE_TUNED: bool = True  # WAL + reader pool + single writer connection
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 256MB
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # 64MB page cache per connection
     
     # Security Configuration
     SECRET_KEY: str = "your-super-secret-key-change-this-in-production-2024"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000  # verified token payloads kept in memory
+    TOKEN_CACHE_TTL: int = 60  # seconds a cached token is trusted before its farmer is re-checked
+    BCRYPT_ROUNDS: int = 12  # work factor; stored hashes are upgraded on the next login when it changes
+    PASSWORD_HASH_WORKERS: int = 2  # threads running bcrypt, so logins cannot take every core
+    PASSWORD_HASH_MAX_PENDING: int = 32  # running + waiting hashes before requests get 503
     
     # CORS Configuration
     CORS_ORIGINS: list = ["*"]
@@ -28,9 +42,40 @@ class Settings(BaseSettings):
     CORS_ALLOW_METHODS: list = ["*"]
     CORS_ALLOW_HEADERS: list = ["*"]
     
+    # Response Compression Configuration
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # brotli is used only if the package is installed
+    
+    # Admission Control Configuration
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 256  # concurrent non-critical requests before 429
+    ADMISSION_MAX_QUEUE_DEPTH: int = 32  # waiting inference calls before 503
+    ADMISSION_LATENCY_SLO: float = 2.0  # p95 request latency target in seconds
+    ADMISSION_RETRY_AFTER: int = 2  # seconds suggested to shed clients
+    ADMISSION_CRITICAL_PATHS: list = ["/health", "/metrics", "/api/v1/auth"]  # never shed
+    ADMISSION_LOW_PRIORITY_PATHS: list = ["/api/jobs"]  # shed first
+    
+    # Health Check Configuration
+    HEALTH_CHECK_INTERVAL: float = 5.0  # seconds between background dependency probes
+    HEALTH_CHECK_STALE_AFTER: float = 15.0  # cached probe results older than this count as failing
+    
+    # Tracing Configuration
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.1  # fraction of requests traced
+    TRACING_EXPORTER: str = "file"  # file, otlp
+    TRACING_FILE_PATH: str = "./traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    
+    # HTTP Caching Configuration
+    CATALOG_CACHE_MAX_AGE: int = 300  # seconds clients may reuse catalog responses before revalidating
+    CATALOG_REFRESH_INTERVAL: float = 30.0  # seconds between disease catalog version checks
+    CATALOG_DEFAULT_LANGUAGE: str = "en"
+    
     # ML Model Configuration
     ML_MODEL_PATH: str = "app/ml/models/plant_model.h5"
     ML_MODEL_INPUT_SIZE: tuple = (224, 224)
+    ML_MODEL_VERSION: Optional[str] = None  # recorded on scans; defaults to a digest of the model file
     ML_MODEL_CLASSES: list = [
         'Tomato_Bacterial_spot', 'Potato___Early_blight', 'Pepper__bell___Bacterial_spot',
         'Potato___healthy', 'Tomato_Early_blight', 'Tomato_Spider_mites_Two_spotted_spider_mite',
@@ -39,6 +84,50 @@ class Settings(BaseSettings):
         'Tomato_Leaf_Mold', 'Tomato_Target_Spot', 'Tomato_mosaic_virus'
     ]
     
+    # Live Camera Scanning Configuration
+    LIVE_SCAN_MAX_FPS: float = 2.0  # Upper bound on predictions per second per connection
+    LIVE_SCAN_MAX_FRAME_BYTES: int = 512 * 1024  # 512KB per compressed frame
+    
+    # Prediction Job Queue Configuration
+    JOB_QUEUE_PATH: str = "./prediction_jobs.db"
+    JOB_WORKERS: int = 2
+    JOB_VISIBILITY_TIMEOUT: float = 60.0  # seconds before a claimed job can be reclaimed
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY: float = 5.0  # seconds, doubled after each failed attempt
+    JOB_POLL_INTERVAL: float = 0.5  # seconds an idle worker waits before polling again
+    
+    # Scan Write Buffer Configuration
+    SCAN_BUFFER_MAX_BATCH: int = 200  # pending scans that trigger an immediate flush
+    SCAN_BUFFER_FLUSH_INTERVAL: float = 0.5  # seconds between background flushes
+    SCAN_BUFFER_MAX_PENDING: int = 10000  # oldest scans are dropped past this while writes fail
+    
+    # Scan Archive Configuration (requires pyarrow)
+    SCAN_ARCHIVE_DIR: str = "./scan_archive"
+    SCAN_ARCHIVE_AFTER_MONTHS: int = 12  # whole calendar months kept in plant_scans
+    SCAN_ARCHIVE_BATCH_SIZE: int = 5000
+    
+    # Accuracy Monitor Configuration
+    ACCURACY_REFRESH_INTERVAL: float = 60.0  # seconds between reloads of persisted confusion counts
+    
+    # Input Drift Configuration
+    DRIFT_WINDOW_MINUTES: int = 60  # width of one histogram window
+    DRIFT_CURRENT_WINDOWS: int = 24  # recent windows compared against the reference
+    DRIFT_REFERENCE_WINDOWS: int = 168  # windows just before those, used as the reference
+    DRIFT_REGION_PRECISION: int = 3  # geohash characters per region (3 = ~150 km cells)
+    DRIFT_MAX_REGIONS: int = 50  # regions tracked separately; scans from others share an "other" region
+    DRIFT_CHECK_INTERVAL: float = 300.0  # seconds between drift checks
+    DRIFT_PSI_THRESHOLD: float = 0.2  # population stability index treated as drift
+    DRIFT_MIN_SAMPLES: int = 100  # fewer scans on either side are not scored
+    
+    # Training Export Configuration
+    TRAINING_EXPORT_DIR: str = "./training_export"
+    TRAINING_EXPORT_SHARD_SIZE: int = 1024  # examples per .npz shard
+    TRAINING_EXPORT_WORKERS: Optional[int] = None  # image decode processes; None = one per CPU
+    TRAINING_EXPORT_IMAGE_ROOT: str = "."  # base directory for local image_url paths
+    
+    # Farmer Listing Configuration
+    FARMER_COUNT_REFRESH_INTERVAL: float = 300.0  # seconds between exact recounts of the farmers table
+    
     # File Upload Configuration
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_IMAGE_TYPES: list = ["image/jpeg", "image/png", "image/jpg"]
@@ -1,13 +1,55 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
 from sqlalchemy.pool import StaticPool
 import os
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.prefork import register_pre_fork, register_post_fork
+from app.core.tracing import trace_engine
+
+def _is_file_sqlite(url: str) -> bool:
+    return url.startswith('sqlite') and ':memory:' not in url and not url.rstrip('/').endswith(':')
+
+# Tuned SQLite: WAL, a pool of reader connections and a single writer connection
+SQLITE_TUNED = settings.SQLITE_TUNED and _is_file_sqlite(settings.DATABASE_URL)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure every new SQLite connection for concurrent reads during writes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.close()
+
+def _create_sqlite_engines(url: str, factory, **kwargs):
+    """
+    Create (reader, writer) engines for a file-backed SQLite database.
+
+    The sync and async engines each get their own writer, so a process can
+    hold two write connections. SQLite still allows only one write
+    transaction at a time: the other writer waits on busy_timeout, so writes
+    stay serialized, but a long sync write can delay async requests.
+    """
+    reader = factory(url, pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0, echo=False, **kwargs)
+    writer = factory(url, pool_size=1, max_overflow=0, echo=False, **kwargs)
+    for e in (reader, writer):
+        event.listen(getattr(e, "sync_engine", e), "connect", _apply_sqlite_pragmas)
+    return reader, writer
 
 # Determine database type and create appropriate engine
-if settings.DATABASE_URL.startswith('sqlite'):
+if SQLITE_TUNED:
+    engine, write_engine = _create_sqlite_engines(
+        settings.DATABASE_URL, create_engine,
+        connect_args={"check_same_thread": False}
+    )
+elif settings.DATABASE_URL.startswith('sqlite'):
     # SQLite configuration for development
     engine = create_engine(
         settings.DATABASE_URL,
@@ -15,6 +57,7 @@ if settings.DATABASE_URL.startswith('sqlite'):
         poolclass=StaticPool,  # Better for SQLite with FastAPI
         echo=False  # Set to True to see SQL queries in logs
     )
+    write_engine = engine
 else:
     # PostgreSQL/other databases
     engine = create_engine(
@@ -23,9 +66,84 @@ else:
         pool_recycle=3600,   # Recycle connections after 1 hour
         echo=False
     )
+    write_engine = engine
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver equivalent"""
+    if url.startswith("sqlite:///"):
+        return "sqlite+aiosqlite:///" + url[len("sqlite:///"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    if url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url[len("postgres://"):]
+    return url
+
+# Async engine for request handlers; the sync engine stays for scripts and workers
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+if SQLITE_TUNED and ASYNC_DATABASE_URL.startswith('sqlite'):
+    async_engine, async_write_engine = _create_sqlite_engines(ASYNC_DATABASE_URL, create_async_engine)
+elif ASYNC_DATABASE_URL.startswith('sqlite'):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+    async_write_engine = async_engine
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=False
+    )
+    async_write_engine = async_engine
+
+_all_engines = {"default": engine, "async": async_engine.sync_engine}
+if write_engine is not engine:
+    _all_engines["writer"] = write_engine
+if async_write_engine is not async_engine:
+    _all_engines["async_writer"] = async_write_engine.sync_engine
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+for _name, _engine in _all_engines.items():
+    instrument_engine(_engine, name=_name)
+    if settings.TRACING_ENABLED:
+        trace_engine(_engine)
+
+def _routing_session_class(reader, writer):
+    """
+    Session class sending flushes and DML to `writer` and other reads to
+    `reader`. Raw text() statements may write, so they also go to `writer`
+    unless marked with execution_options(readonly=True). Once a session has
+    written, it stays on the writer so it reads its own writes.
+    """
+    class RoutingSession(Session):
+        def get_bind(self, mapper=None, clause=None, **kwargs):
+            if (self.info.get("use_writer") or self._flushing or isinstance(clause, UpdateBase)
+                    or (isinstance(clause, TextClause) and not clause.get_execution_options().get("readonly"))):
+                self.info["use_writer"] = True
+                return writer
+            return reader
+    return RoutingSession
+
+# Session factories
+if write_engine is not engine:
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False,
+        class_=_routing_session_class(engine, write_engine)
+    )
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if async_write_engine is not async_engine:
+    AsyncSessionLocal = sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=_routing_session_class(async_engine.sync_engine, async_write_engine.sync_engine),
+        autoflush=False,
+        expire_on_commit=False
+    )
+else:
+    AsyncSessionLocal = sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False  # attributes stay readable after commit without lazy IO
+    )
 
 # Base class for models
 Base = declarative_base()
@@ -42,19 +160,90 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Dependency to get an async database session
+    Usage: 
+        async def some_endpoint(db: AsyncSession = Depends(get_async_db)):
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@register_pre_fork
+def _create_tables_before_fork():
+    """Create tables once in the parent so workers don't race on DDL"""
+    create_tables()
+    for e in _all_engines.values():
+        e.dispose()
+
+@register_post_fork
+def _reset_pool_after_fork():
+    """Drop pooled connections inherited from the parent without closing them"""
+    for e in _all_engines.values():
+        e.dispose(close=False)
+
 def create_tables():
-    """Create all database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create all database tables, plus columns and indexes added since"""
+    Base.metadata.create_all(bind=write_engine)
+    _add_missing_schema()
+
+# Indexes earlier versions created that no longer pay for their write cost
+RETIRED_INDEXES = {
+    "plant_scans": ("ix_plant_scans_disease_predicted",),
+}
+
+def _add_missing_schema():
+    """
+    Bring tables created by an older version up to date. create_all() skips
+    existing tables, so new nullable columns, their foreign keys and new
+    indexes are added here, and retired indexes dropped. SQLite cannot add a
+    constraint to an existing column, so there the foreign key is only
+    declared on columns added now.
+    """
+    with write_engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            added_columns = set()
+            for column in table.columns:
+                if column.name not in existing_columns and column.nullable:
+                    column_type = column.type.compile(dialect=conn.dialect)
+                    references = "".join(
+                        f' REFERENCES {fk.column.table.name} ({fk.column.name})' for fk in column.foreign_keys
+                    )
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{references}'))
+                    added_columns.add(column.name)
+            if conn.dialect.name == "postgresql":
+                constrained = {
+                    (tuple(fk["constrained_columns"]), fk["referred_table"])
+                    for fk in inspector.get_foreign_keys(table.name)
+                }
+                for column in table.columns:
+                    for fk in column.foreign_keys:
+                        if column.name not in added_columns and ((column.name,), fk.column.table.name) not in constrained:
+                            conn.execute(text(
+                                f'ALTER TABLE {table.name} ADD CONSTRAINT fk_{table.name}_{column.name} '
+                                f'FOREIGN KEY ({column.name}) REFERENCES {fk.column.table.name} ({fk.column.name})'
+                            ))
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+            for name in RETIRED_INDEXES.get(table.name, ()):
+                if name in existing_indexes:
+                    conn.execute(text(f"DROP INDEX {name}"))
 
 def drop_tables():
     """Drop all database tables (for testing)"""
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=write_engine)
 
 def check_database_health() -> bool:
     """Check if database is accessible"""
     try:
         with engine.connect() as conn:
-            conn.execute("SELECT 1")
+            conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
         print(f"Database health check failed: {e}")
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Any, Tuple
+
+from app.core.config import settings
+from app.core.database import check_database_health
+from app.ml.inference import get_inference_executor
+from app.ml.model_loader import is_model_loaded
+
+logger = logging.getLogger(__name__)
+
+# A check returns (ok, detail)
+HealthCheck = Callable[[], Tuple[bool, str]]
+
+class HealthMonitor:
+    """
+    Runs dependency checks on a background thread and caches the results.
+
+    Readiness probes only read the cache, so they never wait on a slow
+    dependency. If the refresher itself gets stuck, cached results go stale
+    and count as failing.
+    """
+
+    def __init__(self, interval: float, stale_after: float):
+        self.interval = interval
+        self.stale_after = stale_after
+        self._checks: Dict[str, HealthCheck] = {}
+        self._results: Dict[str, Tuple[bool, str, float]] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, check: HealthCheck):
+        """Add a named dependency check"""
+        self._checks[name] = check
+
+    def refresh(self):
+        """Run every check once and store the results"""
+        for name, check in list(self._checks.items()):
+            try:
+                ok, detail = check()
+            except Exception as e:
+                ok, detail = False, str(e)
+            self._results[name] = (ok, detail, time.monotonic())
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the background refresher"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Return (ready, per-check details) from cached results"""
+        now = time.monotonic()
+        ready = True
+        checks = {}
+        for name in self._checks:
+            result = self._results.get(name)
+            if result is None:
+                ok, detail, age = False, "not checked yet", None
+            else:
+                ok, detail, checked_at = result
+                age = now - checked_at
+                if age > self.stale_after:
+                    ok, detail = False, f"stale result ({detail})"
+            ready = ready and ok
+            checks[name] = {
+                "healthy": ok,
+                "detail": detail,
+                "age_seconds": round(age, 3) if age is not None else None
+            }
+        return ready, checks
+
+def _check_database() -> Tuple[bool, str]:
+    return (True, "connected") if check_database_health() else (False, "unreachable")
+
+def _check_model() -> Tuple[bool, str]:
+    return (True, "loaded") if is_model_loaded() else (False, "not loaded")
+
+def _check_inference() -> Tuple[bool, str]:
+    executor = get_inference_executor()
+    if not executor.is_running:
+        return False, "shut down"
+    return True, f"{executor.in_flight} in flight"
+
+# Global instance
+_health_monitor = HealthMonitor(settings.HEALTH_CHECK_INTERVAL, settings.HEALTH_CHECK_STALE_AFTER)
+_health_monitor.register("database", _check_database)
+_health_monitor.register("model", _check_model)
+_health_monitor.register("inference", _check_inference)
+
+def get_health_monitor() -> HealthMonitor:
+    """Get the process-wide health monitor"""
+    return _health_monitor
\ No newline at end of file
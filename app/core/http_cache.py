@@ -0,0 +1,65 @@
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.metrics import cache_requests_total
+
+# Names of precomputed responses
+SUPPORTED_PLANTS = "supported_plants"
+DISEASE_CATALOG = "disease_catalog"  # published once per language as "disease_catalog:<lang>"
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = _opaque_tag(etag)
+    return any(_opaque_tag(candidate.strip()) == etag for candidate in if_none_match.split(","))
+
+class PrecomputedResponse:
+    """
+    A JSON body serialized once, with an ETag derived from its bytes.
+
+    The ETag is weak because CompressionMiddleware may send the same
+    response gzip- or brotli-encoded, and a strong validator would have to
+    differ per encoding. Weak comparison is all If-None-Match needs.
+    """
+    __slots__ = ("body", "etag", "cache_control")
+
+    def __init__(self, content: Any, max_age: int):
+        self.body = orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+        self.etag = 'W/"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.cache_control = f"public, max-age={max_age}"
+
+    def respond(self, request: Request) -> Response:
+        """Return the body, or 304 Not Modified if the client already has it"""
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            cache_requests_total.inc("http_etag", "hit")
+            return Response(status_code=304, headers=headers)
+        cache_requests_total.inc("http_etag", "miss")
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+_responses: Dict[str, PrecomputedResponse] = {}
+_lock = threading.Lock()
+
+def publish_response(name: str, content: Any, max_age: Optional[int] = None) -> PrecomputedResponse:
+    """Serialize content and make it the current response for `name`"""
+    response = PrecomputedResponse(
+        content, settings.CATALOG_CACHE_MAX_AGE if max_age is None else max_age
+    )
+    with _lock:
+        _responses[name] = response
+    return response
+
+def get_precomputed_response(name: str) -> Optional[PrecomputedResponse]:
+    """Get the current precomputed response for `name`, if any"""
+    return _responses.get(name)
\ No newline at end of file
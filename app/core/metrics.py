@@ -0,0 +1,284 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+OVERFLOW_LABEL = "other"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric(ABC):
+    """
+    Base for metrics with per-thread shards.
+
+    Each thread writes to its own dict, so updates on the hot path take no
+    lock. Shards are summed when the metrics are scraped. The number of label
+    combinations is capped; once the cap is hit, new combinations are recorded
+    under the "other" label value.
+    """
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = 100):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._series = set()
+        self._overflow_key = (OVERFLOW_LABEL,) * len(self.labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _key(self, labelvalues: Tuple[str, ...]) -> Tuple[str, ...]:
+        if labelvalues in self._series:
+            return labelvalues
+        with self._lock:
+            if len(self._series) < self.max_series:
+                self._series.add(labelvalues)
+                return labelvalues
+        return self._overflow_key
+
+    def _snapshots(self) -> List[dict]:
+        with self._lock:
+            shards = list(self._shards)
+        # dict.copy() runs under the GIL, so a concurrent writer cannot break it
+        return [shard.copy() for shard in shards]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Exposition lines for this metric, without HELP/TYPE"""
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        shard = self._shard()
+        key = self._key(labelvalues)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        totals: Dict[tuple, float] = {}
+        for shard in self._snapshots():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0.0) + value
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in totals.items()]
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, max_series: int = 100):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labelvalues: str):
+        shard = self._shard()
+        key = self._key(labelvalues)
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket counts (last slot is +Inf) followed by the running sum
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def render(self) -> List[str]:
+        totals: Dict[tuple, list] = {}
+        for shard in self._snapshots():
+            for key, state in shard.items():
+                state = list(state)
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = state
+                else:
+                    for i, value in enumerate(state):
+                        total[i] += value
+
+        lines = []
+        for key, state in totals.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class GaugeFunc(_Metric):
+    """
+    Gauge read from a callback at scrape time. The callback returns a number,
+    or a dict of label-value tuples to numbers.
+    """
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, func: Callable[[], object],
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.func = func
+
+    def render(self) -> List[str]:
+        value = self.func()
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {float(v)}" for k, v in value.items()]
+
+class CounterFunc(GaugeFunc):
+    """Counter read from a callback at scrape time"""
+    metric_type = "counter"
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = metric.render()
+            except Exception:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+# Global registry
+registry = Registry()
+
+# HTTP
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status")
+))
+
+# Inference
+inference_invoke_duration = registry.register(Histogram(
+    "inference_invoke_seconds", "Time spent in interpreter.invoke()"
+))
+inference_batch_size = registry.register(Histogram(
+    "inference_batch_size", "Images per interpreter invocation",
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+))
+predictions_total = registry.register(Counter(
+    "predictions_total", "Predictions by plant and predicted class",
+    ("plant", "disease"), max_series=64
+))
+
+# Caches
+cache_requests_total = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)",
+    ("cache", "result"), max_series=32
+))
+
+# Database
+db_connection_checkout_duration = registry.register(Histogram(
+    "db_connection_checkout_seconds", "Time a pooled DB connection stays checked out"
+))
+
+# Uploads
+upload_bytes_total = registry.register(Counter(
+    "upload_bytes_total", "Bytes received in uploads by endpoint",
+    ("endpoint",), max_series=16
+))
+upload_size_bytes = registry.register(Histogram(
+    "upload_size_bytes", "Size of individual uploads",
+    buckets=(16e3, 64e3, 256e3, 1e6, 4e6, 10e6)
+))
+
+_pools: Dict[str, object] = {}
+registry.register(GaugeFunc(
+    "db_pool_checked_out", "Connections currently checked out of each pool",
+    lambda: _pool_stat("checkedout", 0), ("pool",)
+))
+registry.register(GaugeFunc(
+    "db_pool_size", "Configured size of each pool",
+    lambda: _pool_stat("size", 1), ("pool",)
+))
+
+def record_upload(endpoint: str, size: int):
+    """Record an uploaded payload"""
+    upload_bytes_total.inc(endpoint, amount=size)
+    upload_size_bytes.observe(size)
+
+class MetricsMiddleware:
+    """
+    Record request latency per route template. Paths that match no route are
+    grouped under "unmatched" so raw URLs never become label values.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = [500]
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                f"{status_code[0] // 100}xx"
+            )
+
+def instrument_engine(engine, name: str = "default"):
+    """Export checkout duration and pool usage for a SQLAlchemy engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_at", None)
+        if started is not None:
+            db_connection_checkout_duration.observe(time.perf_counter() - started)
+
+    _pools[name] = engine.pool
+
+def _pool_stat(attr: str, default: int) -> Dict[tuple, float]:
+    return {
+        (name,): getattr(pool, attr)() if hasattr(pool, attr) else default
+        for name, pool in list(_pools.items())
+    }
\ No newline at end of file
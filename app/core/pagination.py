@@ -0,0 +1,17 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+import orjson
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque keyset cursor pointing just past the given row"""
+    return base64.urlsafe_b64encode(orjson.dumps([created_at.isoformat(), row_id])).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed"""
+    try:
+        created_at, row_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
\ No newline at end of file
@@ -0,0 +1,29 @@
+import logging
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+_pre_fork_hooks: List[Callable[[], None]] = []
+_post_fork_hooks: List[Callable[[], None]] = []
+
+def register_pre_fork(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a hook run in the parent process before workers are forked"""
+    _pre_fork_hooks.append(hook)
+    return hook
+
+def register_post_fork(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a hook run in each worker process right after fork"""
+    _post_fork_hooks.append(hook)
+    return hook
+
+def run_pre_fork_hooks():
+    """Run pre-fork hooks in registration order"""
+    for hook in _pre_fork_hooks:
+        logger.debug(f"Running pre-fork hook {hook.__name__}")
+        hook()
+
+def run_post_fork_hooks():
+    """Run post-fork hooks in registration order"""
+    for hook in _post_fork_hooks:
+        logger.debug(f"Running post-fork hook {hook.__name__}")
+        hook()
\ No newline at end of file
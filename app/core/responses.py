@@ -0,0 +1,22 @@
+from typing import Any, Dict, Iterable, List, Sequence
+import orjson
+from fastapi.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Handles datetimes, UUIDs and numpy arrays natively. Return it directly from
+    an endpoint to also skip FastAPI's jsonable_encoder pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+def rows_to_dicts(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Turn column tuples from a column-only query into dicts ready for serialization"""
+    return [dict(zip(columns, row)) for row in rows]
\ No newline at end of file
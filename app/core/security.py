@@ -1,15 +1,32 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Callable
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
 import secrets
+import threading
+import time
 import re
+import uuid
+import os
 
 from app.core.config import settings
+from app.core.metrics import cache_requests_total, registry, GaugeFunc
+from app.models.user import Farmer
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+
+# Password hashing context. min/max rounds make hashes with any other work
+# factor (weaker or stronger) deprecated, so verify_and_update rehashes them.
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS, bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -19,6 +36,78 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop on a small dedicated thread pool (bcrypt
+    releases the GIL while hashing).
+
+    The pool size caps how many cores hashing can use; past `max_pending`
+    running or waiting calls, requests are refused with 503 rather than
+    queueing behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent sign-ins, try again shortly",
+                    headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+                )
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the hash actually finishes, even if the caller was cancelled meanwhile
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+# Global instance
+_password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+registry.register(GaugeFunc(
+    "password_hash_in_flight", "bcrypt calls running or waiting",
+    lambda: _password_hasher.in_flight
+))
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher"""
+    return _password_hasher
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _password_hasher.run(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await _password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password without blocking the event loop. Also returns a new
+    hash to store when the old one used a different work factor, else None.
+    """
+    return await _password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -31,6 +120,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
+        "jti": uuid.uuid4().hex,  # tokens issued in the same second still differ
         "type": "access"
     })
     
@@ -45,23 +135,137 @@ def create_refresh_token(data: dict) -> str:
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
+        "jti": uuid.uuid4().hex,
         "type": "refresh"
     })
     
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Dict[str, Any]:
-    """Verify and decode a JWT token"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+class TokenCache:
+    """
+    LRU cache of verified JWT payloads, keyed by a digest of the token so
+    raw tokens are not kept in memory. An entry is never served past the
+    token's `exp`, nor for more than `ttl` seconds, so every process
+    re-checks the farmer (see verify_token) at least that often.
+
+    Subject cutoffs mirror Farmer.tokens_valid_after so this process refuses
+    revoked tokens without a query. JWT `iat` has whole-second resolution,
+    so tokens issued in the cutoff second itself are refused too, and
+    tokens without `iat` are treated as issued before it.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._not_before: Dict[str, int] = {}  # subject -> tokens issued in or before this second are refused
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Cached payload of a still-valid token, or None"""
+        key = _token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        """Cache a verified payload; tokens without `exp` are not cached"""
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        key = _token_digest(token)
+        with self._lock:
+            self._entries[key] = (min(float(expires_at), time.time() + self.ttl), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        if not self._not_before:
+            return False
+        with self._lock:
+            not_before = self._not_before.get(str(payload.get("sub")))
+        if not_before is None:
+            return False
+        issued_at = payload.get("iat")
+        return not isinstance(issued_at, (int, float)) or issued_at <= not_before
+
+    def revoke_subject(self, subject: str, cutoff: int):
+        """Refuse tokens a subject was issued in or before second `cutoff`, evicting cached ones"""
+        subject = str(subject)
+        with self._lock:
+            if self._not_before.get(subject, cutoff - 1) >= cutoff:
+                return
+            self._not_before[subject] = cutoff
+            for key in [k for k, (_, payload) in self._entries.items() if str(payload.get("sub")) == subject]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Global instance
+_token_cache = TokenCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.TOKEN_CACHE_TTL)
+
+def get_token_cache() -> TokenCache:
+    """Get the process-wide verified-token cache"""
+    return _token_cache
+
+def _credentials_exception(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=f"Could not validate credentials: {detail}",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def verify_token(token: str, db: AsyncSession) -> Dict[str, Any]:
+    """
+    Verify and decode a JWT token. Its farmer must exist, be active and not
+    have revoked it; the farmer is loaded only on a cache miss, so repeat
+    calls with the same token skip both the query and the signature check.
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        cache_requests_total.inc("jwt", "hit")
+    else:
+        cache_requests_total.inc("jwt", "miss")
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError as e:
+            raise _credentials_exception(str(e))
+        farmer = await db.get(Farmer, str(payload.get("sub")))
+        if farmer is None or farmer.is_active is False:
+            raise _credentials_exception("Account is deactivated or does not exist")
+        if farmer.tokens_valid_after is not None:
+            _token_cache.revoke_subject(farmer.id, farmer.tokens_valid_after)
+        if not _token_cache.is_revoked(payload):
+            _token_cache.put(token, payload)
+
+    if _token_cache.is_revoked(payload):
+        raise _credentials_exception("Token has been revoked")
+    return dict(payload)
+
+async def revoke_farmer_tokens(db: AsyncSession, farmer: Farmer):
+    """
+    Refuse every token issued to a farmer so far (on logout, deactivation or
+    a password change). The cutoff is stored on the farmer, so it holds in
+    every process and across restarts; processes that cached one of the
+    tokens refuse it within TOKEN_CACHE_TTL seconds. Commits the session.
+    """
+    cutoff = int(time.time())
+    farmer.tokens_valid_after = max(farmer.tokens_valid_after or 0, cutoff)
+    await db.commit()
+    _token_cache.revoke_subject(farmer.id, cutoff)
 
 def validate_phone_number(phone: str) -> bool:
     """Validate Indian phone number format"""
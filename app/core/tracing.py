@@ -0,0 +1,253 @@
+import contextlib
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import orjson
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+class Trace:
+    """Spans collected for one sampled request"""
+    __slots__ = ("trace_id", "request_id", "spans")
+
+    def __init__(self, request_id: str):
+        self.trace_id = uuid.uuid4().hex
+        self.request_id = request_id
+        self.spans: List[Dict[str, Any]] = []
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span_id: ContextVar[Optional[str]] = ContextVar("current_span_id", default=None)
+_current_request_id: ContextVar[Optional[str]] = ContextVar("current_request_id", default=None)
+
+_NOOP_SPAN = contextlib.nullcontext()
+
+class _Span:
+    __slots__ = ("trace", "name", "attributes", "span_id", "parent_id", "start_ns", "_token")
+
+    def __init__(self, trace: Trace, name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = None
+        self.start_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.parent_id = _current_span_id.get()
+        self._token = _current_span_id.set(self.span_id)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.time_ns()
+        _current_span_id.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = repr(exc)
+        self.trace.spans.append({
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": end_ns,
+            "duration_ms": (end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes
+        })
+        return False
+
+def span(name: str, **attributes: Any):
+    """
+    Time a block as a span of the current request's trace.
+
+    Outside a sampled request this returns a shared no-op context manager, so
+    instrumented code pays a single context-variable lookup.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name, attributes)
+
+def get_request_id() -> Optional[str]:
+    """Request ID of the request being handled, if any"""
+    return _current_request_id.get()
+
+class SpanExporter(ABC):
+    """
+    Ships finished traces from a background thread. The queue is bounded;
+    traces are dropped rather than slowing down requests.
+    """
+
+    def __init__(self, max_queue: int = 1000):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}", daemon=True)
+        self._thread.start()
+
+    def submit(self, trace: Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.export(batch)
+            except Exception as e:
+                logger.warning(f"Failed to export {len(batch)} traces: {e}")
+
+    @abstractmethod
+    def export(self, traces: List[Trace]):
+        """Send one batch of finished traces"""
+
+class FileSpanExporter(SpanExporter):
+    """Append one JSON line per trace to a local file"""
+
+    def __init__(self, path: str, max_queue: int = 1000):
+        self.path = path
+        super().__init__(max_queue)
+
+    def export(self, traces: List[Trace]):
+        with open(self.path, "ab") as f:
+            for trace in traces:
+                f.write(orjson.dumps({
+                    "trace_id": trace.trace_id,
+                    "request_id": trace.request_id,
+                    "spans": trace.spans
+                }))
+                f.write(b"\n")
+
+class OTLPSpanExporter(SpanExporter):
+    """POST traces as OTLP/HTTP JSON to a collector endpoint"""
+
+    def __init__(self, endpoint: str, service_name: str = "plant-doctor-api", max_queue: int = 1000):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        super().__init__(max_queue)
+
+    @staticmethod
+    def _attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"key": k, "value": {"stringValue": str(v)}} for k, v in values.items()]
+
+    def export(self, traces: List[Trace]):
+        spans = []
+        for trace in traces:
+            for s in trace.spans:
+                spans.append({
+                    "traceId": trace.trace_id,
+                    "spanId": s["span_id"],
+                    "parentSpanId": s["parent_id"] or "",
+                    "name": s["name"],
+                    "startTimeUnixNano": str(s["start_ns"]),
+                    "endTimeUnixNano": str(s["end_ns"]),
+                    "attributes": self._attributes({**s["attributes"], "request_id": trace.request_id})
+                })
+        body = orjson.dumps({"resourceSpans": [{
+            "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}]
+        }]})
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+
+class TracingMiddleware:
+    """
+    Assign each request an ID (reusing an incoming X-Request-ID), echo it in
+    the response, and trace a sampled fraction of requests.
+    """
+
+    def __init__(self, app: ASGIApp, exporter: SpanExporter, sample_rate: float):
+        self.app = app
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        request_id_token = _current_request_id.set(request_id)
+        status_code = [500]
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode())
+                ]
+            await send(message)
+
+        if random.random() >= self.sample_rate:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                _current_request_id.reset(request_id_token)
+            return
+
+        trace = Trace(request_id)
+        trace_token = _current_trace.set(trace)
+        root = _Span(trace, "http.request", {"http.method": scope["method"]})
+        try:
+            with root:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            root.attributes["http.route"] = getattr(route, "path", "unmatched")
+            root.attributes["http.status_code"] = status_code[0]
+            _current_trace.reset(trace_token)
+            _current_request_id.reset(request_id_token)
+            self.exporter.submit(trace)
+
+def trace_engine(engine):
+    """Record a span around every SQL statement executed in a traced request"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        s = span("db.query", statement=statement[:200])
+        if s is not _NOOP_SPAN:
+            s.__enter__()
+            conn.info.setdefault("trace_spans", []).append(s)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().__exit__(None, None, None)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+        if spans:
+            error = exception_context.original_exception
+            spans.pop().__exit__(type(error), error, None)
+
+def create_exporter(kind: str, file_path: str, otlp_endpoint: str) -> SpanExporter:
+    """Build the exporter named by TRACING_EXPORTER"""
+    if kind == "otlp":
+        return OTLPSpanExporter(otlp_endpoint)
+    return FileSpanExporter(os.path.abspath(file_path))
\ No newline at end of file
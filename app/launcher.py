@@ -0,0 +1,134 @@
+"""
+Production launcher: load the model once, then fork worker processes.
+
+    python -m app.launcher --workers 4
+
+The parent imports the application and TensorFlow and reads the model bytes
+and class names. Then it binds the listening socket and forks. Workers
+inherit all of that copy-on-write and only build their own interpreter.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+from app.core.config import settings
+from app.core.prefork import run_pre_fork_hooks, run_post_fork_hooks
+
+logger = logging.getLogger("app.launcher")
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def _run_worker(app, sock: socket.socket, host: str, port: int):
+    """Worker process body; never returns"""
+    import uvicorn
+
+    # Let uvicorn install its own graceful-shutdown handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    run_post_fork_hooks()
+
+    config = uvicorn.Config(app, host=host, port=port, lifespan="on", log_level="info")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    os._exit(0)
+
+class Arbiter:
+    """Forks workers, restarts ones that die and stops them all on SIGTERM/SIGINT"""
+
+    def __init__(self, app, sock: socket.socket, host: str, port: int, workers: int):
+        self.app = app
+        self.sock = sock
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.children: Dict[int, int] = {}  # pid -> worker slot
+        self.stopping = False
+
+    def spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(self.app, self.sock, self.host, self.port)
+            except Exception:
+                logger.exception(f"Worker {slot} crashed")
+            finally:
+                os._exit(1)
+        self.children[pid] = slot
+        logger.info(f"Started worker {slot} (pid {pid})")
+
+    def _handle_stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            slot = self.children.pop(pid, None)
+            if slot is None:
+                continue
+            if not self.stopping:
+                logger.warning(f"Worker {slot} (pid {pid}) exited with status {status}, restarting")
+                time.sleep(1)
+                self.spawn(slot)
+
+        logger.info("All workers stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Plant Doctor API with preforked workers")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--class-names-path", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(name)s %(message)s")
+    started = time.perf_counter()
+
+    # Import the application (and TensorFlow with it) once, in the parent
+    from app.main import app
+    from app.ml.model_loader import share_model
+
+    share_model(args.model_path, args.class_names_path)
+    run_pre_fork_hooks()
+    sock = _bind_socket(args.host, args.port)
+
+    # Move everything loaded so far out of the GC's reach so collections in
+    # workers don't touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    logger.info(f"Parent ready in {time.perf_counter() - started:.2f}s, forking {args.workers} workers")
+    Arbiter(app, sock, args.host, args.port, args.workers).run()
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
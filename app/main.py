@@ -1,18 +1,40 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Depends
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
 from PIL import Image
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 import io
 
+from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.admission import AdmissionMiddleware, get_admission_controller
+from app.core.metrics import MetricsMiddleware, registry, record_upload
+from app.core.health import get_health_monitor
+from app.core.tracing import TracingMiddleware, create_exporter, span
+from app.ml.model_loader import initialize_models
+from app.ml.labels import get_label_registry
+from app.core.responses import ORJSONResponse
+from app.core.http_cache import publish_response, get_precomputed_response, SUPPORTED_PLANTS
+
 # Import database and models
-from app.core.database import get_db, create_tables
-from app.models.farmer import Farmer
+from app.core.database import create_tables, get_async_db
+from app.models.user import Farmer
 from app.models.plant_scan import PlantScan
+from app.api.endpoints import auth, users, live, jobs, predict, scans, analytics, diseases
+from app.services.job_queue import start_workers, stop_workers
+from app.services.scan_writer import get_scan_buffer
+from app.services.farmer_stats import get_farmer_counter
+from app.services.disease_catalog import get_disease_catalog
+from app.services.accuracy_monitor import get_accuracy_monitor
+from app.services.drift_monitor import get_drift_monitor
+from app.services import rollups, scan_alternatives  # register hooks that maintain derived scan tables
 
 app = FastAPI(
     title="Plant Doctor API",
     description="AI-powered plant disease detection",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -23,60 +45,138 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
+app.add_middleware(MetricsMiddleware)
+
+if settings.TRACING_ENABLED:
+    app.add_middleware(
+        TracingMiddleware,
+        exporter=create_exporter(
+            settings.TRACING_EXPORTER, settings.TRACING_FILE_PATH, settings.TRACING_OTLP_ENDPOINT
+        ),
+        sample_rate=settings.TRACING_SAMPLE_RATE
+    )
+
+if settings.ADMISSION_ENABLED:
+    # Added last so it runs first and sheds load before any other work
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=get_admission_controller(),
+        retry_after=settings.ADMISSION_RETRY_AFTER
+    )
+
+app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
+app.include_router(users.router, prefix=f"{settings.API_V1_STR}/farmers", tags=["farmers"])
+app.include_router(live.router, prefix="/api/predict", tags=["live"])
+app.include_router(predict.router, prefix="/api/predict", tags=["predict"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(scans.router, prefix=f"{settings.API_V1_STR}/scans", tags=["scans"])
+app.include_router(analytics.router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
+app.include_router(diseases.router, prefix="/api/diseases", tags=["diseases"])
+
 @app.on_event("startup")
 def on_startup():
     create_tables()
+    get_label_registry().sync()
     print("✅ Database tables created")
+    try:
+        initialize_models()
+        print("✅ ML model loaded")
+    except Exception as e:
+        print(f"⚠️ ML model not loaded: {e}")
+    get_health_monitor().start()
+    get_scan_buffer().start()
+    get_farmer_counter().start()
+    get_disease_catalog().start()
+    get_accuracy_monitor().start()
+    get_drift_monitor().start()
+    start_workers()
+    print("✅ Prediction job workers started")
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_workers()
+    get_scan_buffer().stop()
+    get_farmer_counter().stop()
+    get_disease_catalog().stop()
+    get_accuracy_monitor().stop()
+    get_drift_monitor().stop()
+    get_health_monitor().stop()
 
 @app.get("/")
 async def root():
     return {"message": "🌱 Plant Doctor API is running!"}
 
+@app.get("/health/live")
+async def liveness():
+    # The process is serving requests; no dependency checks
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    ready, checks = get_health_monitor().readiness()
+    return ORJSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": checks},
+        status_code=200 if ready else 503
+    )
+
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
+    # Database only, as monitors expect; model and probe checks live in /health/ready
     try:
-        db.execute("SELECT 1")
+        await db.execute(text("SELECT 1").execution_options(readonly=True))
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
 
+# Served until a model is loaded, which publishes the full plant list
+publish_response(SUPPORTED_PLANTS, {
+    "supported_plants": ["Potato", "Tomato", "Pepper"],
+    "status": "Ready for ML model integration"
+})
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/plants/supported")
-async def supported_plants():
-    return {
-        "supported_plants": ["Potato", "Tomato", "Pepper"],
-        "status": "Ready for ML model integration"
-    }
+async def supported_plants(request: Request):
+    return get_precomputed_response(SUPPORTED_PLANTS).respond(request)
 
 @app.post("/api/predict/test")
-async def test_prediction(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def test_prediction(file: UploadFile = File(...)):
     if not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
     try:
-        contents = await file.read()
+        with span("upload.read", filename=file.filename):
+            contents = await file.read()
+        record_upload("predict_test", len(contents))
         image = Image.open(io.BytesIO(contents))
         
-        # Create test record
-        test_scan = PlantScan(
-            farmer_id="test-farmer-123",
-            image_filename=file.filename,
-            disease_predicted="Test Disease",
-            confidence=0.85,
-            plant_type="Tomato"
-        )
-        
-        db.add(test_scan)
-        db.commit()
+        # Create test record; written in the next bulk flush
+        scan_id = get_scan_buffer().add({
+            "farmer_id": "test-farmer-123",
+            "image_filename": file.filename,
+            "disease_predicted": "Test Disease",
+            "confidence": 0.85,
+            "plant_type": "Tomato"
+        })
         
         return {
             "success": True,
             "message": "API working! Ready for ML model.",
             "image_size": image.size,
-            "scan_id": test_scan.id
+            "scan_id": scan_id
         }
         
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
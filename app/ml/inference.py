@@ -0,0 +1,85 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.metrics import registry, GaugeFunc
+
+logger = logging.getLogger(__name__)
+
+class InferenceExecutor:
+    """
+    Runs model inference off the event loop.
+
+    The TFLite interpreter is not thread-safe, so calls are serialized on a
+    single dedicated thread. The number of submitted-but-unfinished calls is
+    tracked so callers can see how far inference is backed up.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._shutdown = False
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the executor still accepts work"""
+        return not self._shutdown
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls submitted and not yet finished (running + queued)"""
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a free inference thread"""
+        return max(0, self._pending - self.max_workers)
+
+    def _done(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Submit a call from synchronous code"""
+        with self._lock:
+            self._pending += 1
+        # Carry the caller's context vars into the inference thread
+        ctx = contextvars.copy_context()
+        try:
+            future = self._executor.submit(ctx.run, fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a call on the inference thread and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and optionally wait for queued calls"""
+        self._shutdown = True
+        self._executor.shutdown(wait=wait)
+
+# Global instance
+_inference_executor = InferenceExecutor()
+
+registry.register(GaugeFunc(
+    "inference_queue_depth", "Inference calls waiting for the interpreter",
+    lambda: _inference_executor.queue_depth
+))
+registry.register(GaugeFunc(
+    "inference_in_flight", "Inference calls running or waiting",
+    lambda: _inference_executor.in_flight
+))
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get the process-wide inference executor"""
+    return _inference_executor
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Canonical disease labels with compact, stable integer IDs.
+
+Models, settings and the Disease table spell class names differently
+("Potato___Early_blight", "Potato_Early_blight", ...). Every spelling maps
+to one canonical label; scans store its SmallInteger ID.
+
+    python -m app.ml.labels migrate
+"""
+import logging
+import re
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import SessionLocal
+from app.models.disease_label import DiseaseLabel
+
+logger = logging.getLogger(__name__)
+
+# (id, canonical name, plant). IDs are persisted: never renumber or reuse one.
+CANONICAL_LABELS: List[Tuple[int, str, str]] = [
+    (1, "Pepper_bell_Bacterial_spot", "Pepper"),
+    (2, "Pepper_bell_healthy", "Pepper"),
+    (3, "Potato_Early_blight", "Potato"),
+    (4, "Potato_Late_blight", "Potato"),
+    (5, "Potato_healthy", "Potato"),
+    (6, "Tomato_Bacterial_spot", "Tomato"),
+    (7, "Tomato_Early_blight", "Tomato"),
+    (8, "Tomato_Late_blight", "Tomato"),
+    (9, "Tomato_Leaf_Mold", "Tomato"),
+    (10, "Tomato_Septoria_leaf_spot", "Tomato"),
+    (11, "Tomato_Spider_mites", "Tomato"),
+    (12, "Tomato_Target_Spot", "Tomato"),
+    (13, "Tomato_Yellow_Leaf_Curl_Virus", "Tomato"),
+    (14, "Tomato_mosaic_virus", "Tomato"),
+    (15, "Tomato_healthy", "Tomato"),
+]
+
+# Spellings that differ by more than case and separators
+ALIASES = {
+    "Tomato_Spider_mites_Two_spotted_spider_mite": "Tomato_Spider_mites",
+    "Tomato__Tomato_YellowLeaf__Curl_Virus": "Tomato_Yellow_Leaf_Curl_Virus",
+    "Tomato__Tomato_mosaic_virus": "Tomato_mosaic_virus",
+}
+
+_PLANTS = ("Pepper", "Potato", "Tomato")
+
+def label_key(name: str) -> str:
+    """Case- and separator-insensitive lookup key"""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+def canonical_spelling(name: str) -> str:
+    """Canonical spelling for a new label: single underscores between words"""
+    return re.sub(r"_+", "_", re.sub(r"[^A-Za-z0-9]+", "_", name)).strip("_")
+
+class LabelRegistry:
+    """
+    In-memory view of the disease_labels table. Starts from CANONICAL_LABELS
+    so lookups work before the database is reachable.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}  # label_key -> id
+        self._plants: Dict[int, Optional[str]] = {}
+        for label_id, name, plant in CANONICAL_LABELS:
+            self._add(label_id, name, plant)
+        for alias, name in ALIASES.items():
+            self._ids[label_key(alias)] = self._ids[label_key(name)]
+
+    def _add(self, label_id: int, name: str, plant: Optional[str]):
+        self._names[label_id] = name
+        self._plants[label_id] = plant
+        self._ids.setdefault(label_key(name), label_id)
+
+    def resolve(self, name: Optional[str]) -> Optional[int]:
+        """Label ID for any spelling of a class name, or None if unknown"""
+        if not name:
+            return None
+        return self._ids.get(label_key(name))
+
+    def name(self, label_id: int) -> Optional[str]:
+        """Canonical name of a label ID"""
+        return self._names.get(label_id)
+
+    def ids_for(self, class_names: Iterable[str]) -> List[Optional[int]]:
+        """Label ID for each model output index"""
+        return [self.resolve(name) for name in class_names]
+
+    def sync(self, extra_names: Iterable[str] = ()):
+        """
+        Make sure the table holds every canonical label plus `extra_names`
+        (new labels get the next free ID), then reload from it.
+        """
+        for _ in range(3):
+            db = SessionLocal()
+            db.info["use_writer"] = True
+            try:
+                existing = {row.id: row for row in db.execute(select(DiseaseLabel)).scalars()}
+                for label_id, name, plant in CANONICAL_LABELS:
+                    if label_id not in existing:
+                        db.add(DiseaseLabel(id=label_id, name=name, plant_type=plant))
+                db.flush()
+
+                known = {label_key(row.name) for row in existing.values()}
+                known.update(label_key(name) for _, name, _ in CANONICAL_LABELS)
+                next_id = max([0, *existing, *(label_id for label_id, _, _ in CANONICAL_LABELS)]) + 1
+                for name in extra_names:
+                    if self.resolve(name) is None and label_key(name) not in known:
+                        name = canonical_spelling(name)
+                        plant = next((p for p in _PLANTS if name.lower().startswith(p.lower())), None)
+                        db.add(DiseaseLabel(id=next_id, name=name, plant_type=plant))
+                        logger.info(f"Registered new disease label {next_id}: {name}")
+                        known.add(label_key(name))
+                        next_id += 1
+                db.commit()
+
+                rows = db.execute(select(DiseaseLabel.id, DiseaseLabel.name, DiseaseLabel.plant_type)).all()
+            except IntegrityError:
+                # Another process registered labels at the same time; reload and retry
+                db.rollback()
+                continue
+            finally:
+                db.close()
+
+            with self._lock:
+                for label_id, name, plant in rows:
+                    self._add(label_id, name, plant)
+            return
+        raise RuntimeError("Could not sync disease labels")
+
+# Global instance
+_label_registry = LabelRegistry()
+
+def get_label_registry() -> LabelRegistry:
+    """Get the process-wide label registry"""
+    return _label_registry
+
+def migrate_existing_rows(batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Fill label IDs for scans, their alternatives and diseases written before
+    labels existed. Safe to re-run; only rows without IDs are touched.
+    """
+    from app.models.disease import Disease
+    from app.models.plant_scan import PlantScan
+    from app.services.scan_alternatives import backfill_alternatives
+
+    registry = get_label_registry()
+    db = SessionLocal()
+    try:
+        names = db.execute(
+            select(PlantScan.disease_predicted).where(PlantScan.disease_label_id.is_(None)).distinct()
+        ).scalars().all()
+    finally:
+        db.close()
+    registry.sync(names)
+
+    db = SessionLocal()
+    db.info["use_writer"] = True
+    counts = {"scans": 0, "diseases": 0, "unknown_labels": 0}
+    try:
+        for name in names:
+            label_id = registry.resolve(name)
+            if label_id is None:
+                counts["unknown_labels"] += 1
+                continue
+            result = db.execute(
+                update(PlantScan)
+                .where(PlantScan.disease_predicted == name, PlantScan.disease_label_id.is_(None))
+                .values(disease_label_id=label_id)
+            )
+            counts["scans"] += result.rowcount
+        db.commit()
+
+        for disease in db.execute(select(Disease).where(Disease.label_id.is_(None))).scalars():
+            disease.label_id = registry.resolve(disease.name)
+            counts["diseases"] += disease.label_id is not None
+        db.commit()
+    finally:
+        db.close()
+
+    counts["alternatives"] = backfill_alternatives(batch_size)
+    return counts
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("usage: python -m app.ml.labels migrate")
+    logging.basicConfig(level=logging.INFO)
+    from app.core.database import create_tables
+    import app.models  # noqa: F401  (register every table)
+    create_tables()
+    logger.info(f"Migrated rows: {migrate_existing_rows()}")
\ No newline at end of file
@@ -1,12 +1,29 @@
 import os
 import json
+import hashlib
 import logging
 import numpy as np
 import tensorflow as tf
+from .labels import get_label_registry
 from .predictor import PlantDiseasePredictor
+from app.core.config import settings
+from app.core.http_cache import publish_response, SUPPORTED_PLANTS
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'models/plant_disease_model.tflite')
+DEFAULT_CLASS_NAMES_PATH = os.path.join(os.path.dirname(__file__), 'models/class_names.json')
+
+# Fallback to your specific plant classes
+DEFAULT_CLASS_NAMES = [
+    "Pepper_bell_Bacterial_spot", "Pepper_bell_healthy",
+    "Potato_Early_blight", "Potato_Late_blight", "Potato_healthy",
+    "Tomato_Bacterial_spot", "Tomato_Early_blight", "Tomato_Late_blight",
+    "Tomato_Leaf_Mold", "Tomato_Septoria_leaf_spot", "Tomato_Spider_mites",
+    "Tomato_Target_Spot", "Tomato_Yellow_Leaf_Curl_Virus", "Tomato_mosaic_virus",
+    "Tomato_healthy"
+]
+
 class ModelLoader:
     def __init__(self):
         self.interpreter = None
@@ -14,27 +31,61 @@ class ModelLoader:
         self.output_details = None
         self.predictor = None
         self.class_names = []
+        self.model_version = None
         self.target_plants = ['Potato', 'Tomato', 'Pepper']  # Your target plants
         
+        # Model bytes and class names loaded once by a preforking parent process
+        self.shared_model_content = None
+        self.shared_class_names = None
+    
+    def read_class_names(self, class_names_path: str = None) -> list:
+        """Read class names from disk, falling back to the built-in list"""
+        if class_names_path is None:
+            class_names_path = DEFAULT_CLASS_NAMES_PATH
+        
+        if os.path.exists(class_names_path):
+            with open(class_names_path, 'r') as f:
+                class_names = json.load(f)
+            logger.info(f"Loaded {len(class_names)} class names for {len(self.target_plants)} target plants")
+            return class_names
+        
+        logger.warning("Class names file not found, using default names for Potato, Tomato, Pepper")
+        return list(DEFAULT_CLASS_NAMES)
+    
+    @staticmethod
+    def model_version_for(model_content: bytes) -> str:
+        """ML_MODEL_VERSION if set, otherwise a short digest of the model file"""
+        return settings.ML_MODEL_VERSION or hashlib.sha256(model_content).hexdigest()[:12]
+    
+    def share_model(self, model_path: str = None, class_names_path: str = None):
+        """
+        Read the model and class names once so that forked workers can build
+        their interpreters from the inherited copy-on-write bytes.
+        """
+        if model_path is None:
+            model_path = DEFAULT_MODEL_PATH
+        
+        with open(model_path, 'rb') as f:
+            self.shared_model_content = f.read()
+        self.shared_class_names = self.read_class_names(class_names_path)
+        logger.info(f"Shared {len(self.shared_model_content)} bytes of model for worker processes")
+        
     def load_model(self, model_path: str = None, class_names_path: str = None):
         """Load the TFLite model and class names"""
         try:
-            # Set default paths if not provided
-            if model_path is None:
-                model_path = os.path.join(
-                    os.path.dirname(__file__), 
-                    'models/plant_disease_model.tflite'
-                )
-            
-            if class_names_path is None:
-                class_names_path = os.path.join(
-                    os.path.dirname(__file__), 
-                    'models/class_names.json'
-                )
-            
             # Load TFLite model
-            logger.info(f"Loading TFLite model from: {model_path}")
-            self.interpreter = tf.lite.Interpreter(model_path=model_path)
+            if self.shared_model_content is not None:
+                # Each process needs its own interpreter, but the model bytes are shared
+                logger.info("Building TFLite interpreter from shared model bytes")
+                self.interpreter = tf.lite.Interpreter(model_content=self.shared_model_content)
+                self.model_version = self.model_version_for(self.shared_model_content)
+            else:
+                if model_path is None:
+                    model_path = DEFAULT_MODEL_PATH
+                logger.info(f"Loading TFLite model from: {model_path}")
+                self.interpreter = tf.lite.Interpreter(model_path=model_path)
+                with open(model_path, 'rb') as f:
+                    self.model_version = self.model_version_for(f.read())
             self.interpreter.allocate_tensors()
             
             # Get input and output tensors
@@ -45,21 +96,20 @@ class ModelLoader:
             logger.info(f"Output details: {self.output_details[0]}")
             
             # Load class names
-            if os.path.exists(class_names_path):
-                with open(class_names_path, 'r') as f:
-                    self.class_names = json.load(f)
-                logger.info(f"Loaded {len(self.class_names)} class names for {len(self.target_plants)} target plants")
+            if self.shared_class_names is not None:
+                self.class_names = self.shared_class_names
             else:
-                # Fallback to your specific plant classes
-                self.class_names = [
-                    "Pepper_bell_Bacterial_spot", "Pepper_bell_healthy",
-                    "Potato_Early_blight", "Potato_Late_blight", "Potato_healthy",
-                    "Tomato_Bacterial_spot", "Tomato_Early_blight", "Tomato_Late_blight",
-                    "Tomato_Leaf_Mold", "Tomato_Septoria_leaf_spot", "Tomato_Spider_mites",
-                    "Tomato_Target_Spot", "Tomato_Yellow_Leaf_Curl_Virus", "Tomato_mosaic_virus",
-                    "Tomato_healthy"
-                ]
-                logger.warning("Class names file not found, using default names for Potato, Tomato, Pepper")
+                self.class_names = self.read_class_names(class_names_path)
+            
+            # Map output indices to canonical label IDs, registering new labels
+            registry = get_label_registry()
+            label_ids = registry.ids_for(self.class_names)
+            if None in label_ids:
+                try:
+                    registry.sync(self.class_names)
+                    label_ids = registry.ids_for(self.class_names)
+                except Exception as e:
+                    logger.warning(f"Could not register new disease labels: {str(e)}")
             
             # Initialize predictor
             self.predictor = PlantDiseasePredictor(
@@ -67,10 +117,19 @@ class ModelLoader:
                 input_details=self.input_details,
                 output_details=self.output_details,
                 class_names=self.class_names,
-                target_plants=self.target_plants
+                target_plants=self.target_plants,
+                label_ids=label_ids,
+                model_version=self.model_version
             )
             
-            logger.info("TFLite model loaded successfully")
+            # Precompute catalog responses that only change with the model
+            publish_response(SUPPORTED_PLANTS, {
+                "supported_plants": self.target_plants,
+                "plants": self.predictor.get_supported_plants(),
+                "status": "Model loaded"
+            })
+            
+            logger.info(f"TFLite model {self.model_version} loaded successfully")
             
         except Exception as e:
             logger.error(f"Error loading TFLite model: {str(e)}")
@@ -85,6 +144,18 @@ def get_predictor():
         _model_loader.load_model()
     return _model_loader.predictor
 
+def is_model_loaded() -> bool:
+    """Check whether the model has been loaded"""
+    return _model_loader.predictor is not None
+
+def get_model_version():
+    """Version of the loaded model, or None before it loads"""
+    return _model_loader.model_version
+
+def share_model(model_path: str = None, class_names_path: str = None):
+    """Load model bytes in a preforking parent process"""
+    _model_loader.share_model(model_path, class_names_path)
+
 def initialize_models():
     """Initialize models on application startup"""
     _model_loader.load_model()
\ No newline at end of file
@@ -1,21 +1,52 @@
 import numpy as np
 from PIL import Image
 import logging
-from typing import Dict, Any, List
-from app.utils.image_processing import preprocess_image, validate_image, enhance_image, get_image_statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.metrics import inference_invoke_duration, inference_batch_size, predictions_total
+from app.core.tracing import span
+from app.utils.image_processing import preprocess_image, validate_image, enhance_image, get_image_statistics, get_array_statistics
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class SupportedPlant:
+    """One plant the model covers; immutable so the precomputed list can be shared"""
+    plant_name: str
+    diseases_count: int
+    diseases: Tuple[str, ...]
+    has_healthy_class: bool
+
 class PlantDiseasePredictor:
-    def __init__(self, interpreter, input_details, output_details, class_names: List[str], target_plants: List[str]):
+    def __init__(self, interpreter, input_details, output_details, class_names: List[str], target_plants: List[str],
+                 label_ids: Optional[List[Optional[int]]] = None, model_version: Optional[str] = None):
         self.interpreter = interpreter
         self.input_details = input_details
         self.output_details = output_details
         self.class_names = class_names
         self.target_plants = target_plants
         
+        # Canonical disease label ID for each output index (see app.ml.labels)
+        self.label_ids = label_ids or [None] * len(class_names)
+        
+        # Recorded on each scan so feedback can be attributed to the model that made the call
+        self.model_version = model_version
+        
         # Create plant-specific information
         self.plant_categories = self._categorize_by_plant()
+        
+        # Supported plants only change with the class names, so build them once
+        self._supported_plants = self._build_supported_plants()
+        
+        # Reused input tensor for raw pixel uploads
+        self._input_buffer = np.empty(self.input_details[0]['shape'], dtype=np.float32)
+    
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        """Model input size as (height, width)"""
+        input_shape = self.input_details[0]['shape']
+        return int(input_shape[1]), int(input_shape[2])
     
     def _categorize_by_plant(self) -> Dict[str, List[str]]:
         """Categorize diseases by plant type"""
@@ -24,8 +55,12 @@ class PlantDiseasePredictor:
             categories[plant] = [cls for cls in self.class_names if plant.lower() in cls.lower()]
         return categories
     
-    def get_supported_plants(self) -> List[Dict[str, Any]]:
+    def get_supported_plants(self) -> Tuple[SupportedPlant, ...]:
         """Get list of supported plants and their diseases"""
+        return self._supported_plants
+    
+    def _build_supported_plants(self) -> Tuple[SupportedPlant, ...]:
+        """Build the list of supported plants and their diseases"""
         supported = []
         for plant in self.target_plants:
             diseases = [cls.replace(f"{plant}_", "") for cls in self.class_names 
@@ -33,13 +68,13 @@ class PlantDiseasePredictor:
             healthy = any(cls for cls in self.class_names 
                          if cls.startswith(plant) and "healthy" in cls)
             
-            supported.append({
-                "plant_name": plant,
-                "diseases_count": len(diseases),
-                "diseases": diseases,
-                "has_healthy_class": healthy
-            })
-        return supported
+            supported.append(SupportedPlant(
+                plant_name=plant,
+                diseases_count=len(diseases),
+                diseases=tuple(diseases),
+                has_healthy_class=healthy
+            ))
+        return tuple(supported)
     
     def is_supported_plant(self, predicted_class: str) -> bool:
         """Check if the predicted plant is in our target plants"""
@@ -60,14 +95,14 @@ class PlantDiseasePredictor:
             if not validate_image(image):
                 raise ValueError("Invalid image provided for prediction")
             
-            # Enhance image for better analysis
-            enhanced_image = enhance_image(image)
-            
             # Preprocess image - get target size from model input
             input_shape = self.input_details[0]['shape']
             target_size = (input_shape[1], input_shape[2])  # (height, width)
             
-            processed_image = preprocess_image(enhanced_image, target_size=target_size)
+            with span("preprocess_image"):
+                # Enhance image for better analysis
+                enhanced_image = enhance_image(image)
+                processed_image = preprocess_image(enhanced_image, target_size=target_size)
             
             # Remove batch dimension for TFLite (if needed)
             if processed_image.shape[0] == 1:
@@ -76,57 +111,100 @@ class PlantDiseasePredictor:
             # Set input tensor
             self.interpreter.set_tensor(self.input_details[0]['index'], processed_image.astype(np.float32))
             
-            # Run inference
-            self.interpreter.invoke()
+            return self._invoke_and_decode(get_image_statistics(image))
             
-            # Get prediction results
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            predictions = output_data[0]  # Remove batch dimension
+        except Exception as e:
+            logger.error(f"TFLite prediction error: {str(e)}")
+            raise
+    
+    def predict_tensor(self, pixels: np.ndarray) -> Dict[str, Any]:
+        """
+        Predict plant disease from raw RGB pixels already at the model input size.
+        
+        Skips decoding, enhancement and resizing; the pixels are copied straight
+        into the input tensor.
+        
+        Args:
+            pixels: uint8 array of shape (height, width, 3)
             
-            # Process results
-            confidence = float(np.max(predictions))
-            predicted_class_idx = int(np.argmax(predictions))
-            predicted_class = self.class_names[predicted_class_idx]
+        Returns:
+            Dictionary containing prediction results
+        """
+        try:
+            input_detail = self.input_details[0]
+            if input_detail['dtype'] == np.uint8:
+                # Quantized model takes the pixels as they are
+                self.interpreter.set_tensor(input_detail['index'], pixels[np.newaxis])
+            else:
+                with span("preprocess_tensor"):
+                    np.multiply(pixels, np.float32(1.0 / 255.0), out=self._input_buffer[0])
+                self.interpreter.set_tensor(input_detail['index'], self._input_buffer)
             
-            # Get plant type from prediction
-            predicted_plant = next((plant for plant in self.target_plants 
-                                  if plant.lower() in predicted_class.lower()), "Unknown")
+            return self._invoke_and_decode(get_array_statistics(pixels, mode="RGB"))
             
-            # Get top 3 predictions (filtered for target plants)
-            top_3_indices = np.argsort(predictions)[-3:][::-1]
+        except Exception as e:
+            logger.error(f"TFLite prediction error: {str(e)}")
+            raise
+    
+    def _invoke_and_decode(self, image_statistics: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the interpreter on the input tensor already set and build the result"""
+        # Run inference
+        invoke_started = time.perf_counter()
+        with span("inference.invoke"):
+            self.interpreter.invoke()
+        inference_invoke_duration.observe(time.perf_counter() - invoke_started)
+        inference_batch_size.observe(1)
+        
+        # Get prediction results
+        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
+        predictions = output_data[0]  # Remove batch dimension
+        
+        # Process results
+        confidence = float(np.max(predictions))
+        predicted_class_idx = int(np.argmax(predictions))
+        predicted_class = self.class_names[predicted_class_idx]
+        
+        # Get plant type from prediction
+        predicted_plant = next((plant for plant in self.target_plants 
+                              if plant.lower() in predicted_class.lower()), "Unknown")
+        
+        predictions_total.inc(predicted_plant, predicted_class)
+        
+        # Get top 3 predictions (filtered for target plants)
+        top_3_indices = np.argsort(predictions)[-3:][::-1]
+        top_predictions = [
+            {
+                "disease": self.class_names[i],
+                "disease_id": self.label_ids[i],
+                "confidence": float(predictions[i]),
+                "plant": next((p for p in self.target_plants if p.lower() in self.class_names[i].lower()), "Unknown")
+            }
+            for i in top_3_indices
+            if any(p.lower() in self.class_names[i].lower() for p in self.target_plants)
+        ]
+        
+        # If no target plant predictions found, use original top 3
+        if not top_predictions:
             top_predictions = [
                 {
                     "disease": self.class_names[i],
+                    "disease_id": self.label_ids[i],
                     "confidence": float(predictions[i]),
                     "plant": next((p for p in self.target_plants if p.lower() in self.class_names[i].lower()), "Unknown")
                 }
                 for i in top_3_indices
-                if any(p.lower() in self.class_names[i].lower() for p in self.target_plants)
             ]
-            
-            # If no target plant predictions found, use original top 3
-            if not top_predictions:
-                top_predictions = [
-                    {
-                        "disease": self.class_names[i],
-                        "confidence": float(predictions[i]),
-                        "plant": next((p for p in self.target_plants if p.lower() in self.class_names[i].lower()), "Unknown")
-                    }
-                    for i in top_3_indices
-                ]
-            
-            return {
-                "predicted_disease": predicted_class,
-                "predicted_plant": predicted_plant,
-                "confidence": confidence,
-                "top_predictions": top_predictions,
-                "is_healthy": "healthy" in predicted_class.lower(),
-                "is_supported_plant": self.is_supported_plant(predicted_class),
-                "image_statistics": get_image_statistics(image),
-                "model_type": "tflite",
-                "supported_plants": self.target_plants
-            }
-            
-        except Exception as e:
-            logger.error(f"TFLite prediction error: {str(e)}")
-            raise
\ No newline at end of file
+        
+        return {
+            "predicted_disease": predicted_class,
+            "disease_id": self.label_ids[predicted_class_idx],
+            "predicted_plant": predicted_plant,
+            "confidence": confidence,
+            "top_predictions": top_predictions,
+            "is_healthy": "healthy" in predicted_class.lower(),
+            "is_supported_plant": self.is_supported_plant(predicted_class),
+            "image_statistics": image_statistics,
+            "model_type": "tflite",
+            "model_version": self.model_version,
+            "supported_plants": self.target_plants
+        }
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""
+Exports scans with farmer feedback as training examples.
+
+Scans are streamed from a server-side cursor, images are loaded, decoded
+and resized on a process pool, and examples are written to fixed-size
+.npz shards (images, label_ids, labels, scan_ids, feedback_rating). At most
+one shard plus a bounded window of in-flight images is held in memory.
+
+A watermark file next to the shards records the last exported scan, so a
+re-run only exports feedback given since then. A scan whose feedback was
+edited is exported again; each run then drops its earlier examples from
+older shards, so every scan_id appears once, with its latest label. If a
+run stops before that step, readers keep the last occurrence of each
+scan_id in shard order (see latest_examples()). Archived scans can no
+longer receive feedback, so only --full runs read the scan archive. A scan
+whose feedback arrives after one export and that is archived before the
+next is therefore only picked up by the next --full run.
+
+    python -m app.ml.training_export [--output DIR] [--full | --compact]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import urllib.request
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import and_, func, or_, select, tuple_
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.ml.labels import get_label_registry
+from app.models.plant_scan import PlantScan
+from app.services.scan_archive import get_scan_archive
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_FILE = "_watermark.json"
+
+# When a scan's feedback last changed; older rows have no feedback_provided_at
+FEEDBACK_TIME = func.coalesce(PlantScan.feedback_provided_at, PlantScan.updated_at, PlantScan.created_at)
+
+EXPORT_COLUMNS = ("id", "image_url", "disease_predicted", "is_correct_prediction", "actual_disease", "feedback_rating")
+
+# Archived rows have no feedback time and never move the watermark
+ArchivedScan = namedtuple("ArchivedScan", EXPORT_COLUMNS)
+
+def load_training_image(source: str, image_root: str, size: Tuple[int, int],
+                        scan_id: Optional[str] = None) -> Optional[np.ndarray]:
+    """Fetch an image_url and return it as an RGB uint8 array of `size`, or None if unreadable"""
+    try:
+        if source.startswith(("http://", "https://")):
+            with urllib.request.urlopen(source, timeout=30) as response:
+                data = response.read()
+        else:
+            with open(os.path.join(image_root, source.lstrip("/")), "rb") as f:
+                data = f.read()
+        image = Image.open(io.BytesIO(data))
+        # JPEG can decode straight at a reduced scale, which is much cheaper than a full decode
+        image.draft("RGB", size)
+        return np.asarray(image.convert("RGB").resize(size, Image.Resampling.BILINEAR), dtype=np.uint8)
+    except Exception as e:
+        logger.warning(f"Skipping scan {scan_id}: cannot load {source}: {e}")
+        return None
+
+def training_label(scan) -> Optional[str]:
+    """Class name a scan should be trained as, from its feedback"""
+    if scan.is_correct_prediction:
+        return scan.disease_predicted
+    return scan.actual_disease or None
+
+def _write_shard(path: str, **arrays: np.ndarray):
+    directory, name = os.path.split(path)
+    # Dot-prefixed files are ignored by readers until renamed into place
+    temporary = os.path.join(directory, f".{name}")
+    with open(temporary, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temporary, path)
+
+def shard_paths(output_dir: str) -> List[str]:
+    """Shard files in export order"""
+    return sorted(
+        os.path.join(output_dir, name) for name in os.listdir(output_dir)
+        if name.startswith("shard-") and name.endswith(".npz")
+    )
+
+def compact_shards(output_dir: str) -> int:
+    """
+    Drop examples superseded by a later export of the same scan, rewriting
+    (or removing) the older shards; returns the number dropped. Only
+    scan_ids are loaded for shards that need no change.
+    """
+    seen = set()
+    dropped = 0
+    for path in reversed(shard_paths(output_dir)):
+        with np.load(path) as shard:
+            scan_ids = shard["scan_ids"]
+            keep = np.ones(len(scan_ids), dtype=bool)
+            # Newest first, so within a shard the last occurrence wins too
+            for i in range(len(scan_ids) - 1, -1, -1):
+                scan_id = str(scan_ids[i])
+                if scan_id in seen:
+                    keep[i] = False
+                else:
+                    seen.add(scan_id)
+            if keep.all():
+                continue
+            dropped += int((~keep).sum())
+            arrays = {name: shard[name][keep] for name in shard.files} if keep.any() else None
+        if arrays is None:
+            os.remove(path)
+        else:
+            _write_shard(path, **arrays)
+    return dropped
+
+def latest_examples(output_dir: str):
+    """
+    Yield (image, label_id, label, scan_id, feedback_rating) for the last
+    exported example of each scan, newest shard first; the same result as
+    reading the shards after compact_shards()
+    """
+    seen = set()
+    for path in reversed(shard_paths(output_dir)):
+        with np.load(path) as shard:
+            scan_ids = shard["scan_ids"]
+            rows = [i for i in range(len(scan_ids) - 1, -1, -1) if str(scan_ids[i]) not in seen]
+            if not rows:
+                continue
+            images, label_ids, labels, ratings = (
+                shard["images"], shard["label_ids"], shard["labels"], shard["feedback_rating"]
+            )
+            for i in rows:
+                scan_id = str(scan_ids[i])
+                if scan_id in seen:
+                    continue
+                seen.add(scan_id)
+                yield images[i], int(label_ids[i]), str(labels[i]), scan_id, float(ratings[i])
+
+class ShardWriter:
+    """Accumulates examples and writes them out shard_size at a time"""
+
+    def __init__(self, output_dir: str, shard_size: int, first_shard: int):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.next_shard = first_shard
+        self.examples = 0
+        self._reset()
+
+    def _reset(self):
+        self._images: List[np.ndarray] = []
+        self._label_ids: List[int] = []
+        self._labels: List[str] = []
+        self._scan_ids: List[str] = []
+        self._ratings: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def add(self, image: np.ndarray, label_id: Optional[int], label: str, scan_id: str, rating: Optional[float]):
+        self._images.append(image)
+        self._label_ids.append(-1 if label_id is None else label_id)
+        self._labels.append(label)
+        self._scan_ids.append(scan_id)
+        self._ratings.append(np.nan if rating is None else rating)
+
+    def flush(self) -> Optional[str]:
+        """Write buffered examples as the next shard; returns its path"""
+        if not self._images:
+            return None
+        path = os.path.join(self.output_dir, f"shard-{self.next_shard:06d}.npz")
+        _write_shard(
+            path,
+            images=np.stack(self._images),
+            label_ids=np.asarray(self._label_ids, dtype=np.int16),
+            labels=np.asarray(self._labels),
+            scan_ids=np.asarray(self._scan_ids),
+            feedback_rating=np.asarray(self._ratings, dtype=np.float32)
+        )
+        self.examples += len(self._images)
+        self.next_shard += 1
+        self._reset()
+        return path
+
+def read_watermark(output_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(output_dir, WATERMARK_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def write_watermark(output_dir: str, last_key: Optional[Tuple[datetime, str]], next_shard: int):
+    path = os.path.join(output_dir, WATERMARK_FILE)
+    watermark = {"next_shard": next_shard, "updated_at": datetime.now(timezone.utc).isoformat()}
+    if last_key is not None:
+        watermark.update(feedback_time=last_key[0].isoformat(), scan_id=last_key[1])
+    with open(path + ".tmp", "w") as f:
+        json.dump(watermark, f)
+    os.replace(path + ".tmp", path)
+
+def _archived_scans(batch_size: int):
+    """Labeled scans with an image from the scan archive"""
+    archive = get_scan_archive()
+    if not archive.has_data():
+        return
+    import pyarrow.dataset as ds
+    correct = ds.field("is_correct_prediction")
+    batches = archive.batches(EXPORT_COLUMNS, filter=ds.field("image_url").is_valid() & (
+        (correct == True) | ((correct == False) & ds.field("actual_disease").is_valid())  # noqa: E712
+    ), batch_size=batch_size)
+    for batch in batches:
+        for scan in batch.to_pylist():
+            yield ArchivedScan(**scan)
+
+def export_training_data(output_dir: str, shard_size: int, workers: Optional[int] = None,
+                         full: bool = False, image_root: str = ".") -> Dict[str, int]:
+    """
+    Write labeled scans to .npz shards in `output_dir`. Unless `full` (which
+    clears the directory first and also exports archived scans), only scans
+    whose feedback is newer than the stored watermark are exported.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if full:
+        for name in os.listdir(output_dir):
+            if name.startswith("shard-") or name == WATERMARK_FILE:
+                os.remove(os.path.join(output_dir, name))
+    watermark = read_watermark(output_dir)
+    size = tuple(settings.ML_MODEL_INPUT_SIZE)
+    registry = get_label_registry()
+
+    query = (
+        select(
+            PlantScan.id, PlantScan.image_url, PlantScan.disease_predicted, PlantScan.is_correct_prediction,
+            PlantScan.actual_disease, PlantScan.feedback_rating, FEEDBACK_TIME.label("feedback_time")
+        )
+        .where(PlantScan.image_url.isnot(None))
+        .where(or_(
+            PlantScan.is_correct_prediction.is_(True),
+            and_(PlantScan.is_correct_prediction.is_(False), PlantScan.actual_disease.isnot(None))
+        ))
+        .order_by(FEEDBACK_TIME, PlantScan.id)
+        .execution_options(stream_results=True, yield_per=shard_size)
+    )
+    if watermark.get("feedback_time"):
+        since = (datetime.fromisoformat(watermark["feedback_time"]), watermark["scan_id"])
+        query = query.where(tuple_(FEEDBACK_TIME, PlantScan.id) > tuple_(*since))
+
+    writer = ShardWriter(output_dir, shard_size, watermark.get("next_shard", 0))
+    counts = {"scanned": 0, "exported": 0, "skipped": 0, "shards": 0}
+    window = deque()  # (row, future), in cursor order
+    max_in_flight = (workers or os.cpu_count() or 1) * 4
+    last_key = None
+
+    def drain(keep: int):
+        nonlocal last_key
+        while len(window) > keep:
+            row, future = window.popleft()
+            image = future.result()
+            if not isinstance(row, ArchivedScan):
+                last_key = (row.feedback_time, row.id)
+            if image is None:
+                counts["skipped"] += 1
+            else:
+                label = training_label(row)
+                writer.add(image, registry.resolve(label), label, row.id, row.feedback_rating)
+            if len(writer) >= shard_size:
+                writer.flush()
+                counts["shards"] += 1
+                # Everything up to here is on disk; a rerun resumes after it
+                write_watermark(output_dir, last_key, writer.next_shard)
+
+    db = SessionLocal()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Archived scans go first, so the watermark only ever comes from hot rows
+            rows = chain(_archived_scans(shard_size) if full else (), db.execute(query))
+            for row in rows:
+                counts["scanned"] += 1
+                window.append((row, pool.submit(load_training_image, row.image_url, image_root, size, row.id)))
+                drain(max_in_flight)
+            drain(0)
+    finally:
+        db.close()
+
+    if len(writer):
+        writer.flush()
+        counts["shards"] += 1
+    if last_key is not None or counts["shards"]:
+        write_watermark(output_dir, last_key, writer.next_shard)
+    counts["exported"] = writer.examples
+    counts["superseded"] = compact_shards(output_dir) if counts["shards"] else 0
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Export scans with feedback as training shards")
+    parser.add_argument("--output", default=settings.TRAINING_EXPORT_DIR)
+    parser.add_argument("--shard-size", type=int, default=settings.TRAINING_EXPORT_SHARD_SIZE)
+    parser.add_argument("--workers", type=int, default=settings.TRAINING_EXPORT_WORKERS)
+    parser.add_argument("--image-root", default=settings.TRAINING_EXPORT_IMAGE_ROOT)
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and export everything")
+    parser.add_argument("--compact", action="store_true",
+                        help="Only drop superseded examples from existing shards")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.compact:
+        logger.info(f"Dropped {compact_shards(args.output)} superseded examples from {args.output}")
+        return
+    counts = export_training_data(args.output, args.shard_size, args.workers, args.full, args.image_root)
+    logger.info(f"Training export to {args.output}: {counts}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
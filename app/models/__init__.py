@@ -1,6 +1,9 @@
 # Import all models here so they can be discovered by SQLAlchemy
 from app.models.user import Farmer
 from app.models.plant_scan import PlantScan
-from app.models.disease import Disease
+from app.models.disease import Disease, CatalogVersion
+from app.models.scan_rollup import ScanDailyRollup
+from app.models.disease_label import DiseaseLabel, ScanAlternative
+from app.models.scan_accuracy import ConfusionCount
 
-__all__ = ["Farmer", "PlantScan", "Disease"]
\ No newline at end of file
+__all__ = ["Farmer", "PlantScan", "Disease", "CatalogVersion", "ScanDailyRollup", "DiseaseLabel", "ScanAlternative", "ConfusionCount"]
\ No newline at end of file
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, String, Text, JSON, Boolean
+from sqlalchemy import Column, String, Text, JSON, Boolean, Integer, SmallInteger, DateTime, ForeignKey, event, insert, update
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
 import uuid
 from app.core.database import Base
 
@@ -10,6 +12,7 @@ class Disease(Base):
     
     # Disease identification
     name = Column(String(100), unique=True, nullable=False)  # "Tomato_Bacterial_spot"
+    label_id = Column(SmallInteger, ForeignKey("disease_labels.id"), unique=True)  # set by app.ml.labels migrate
     scientific_name = Column(String(200))
     common_names = Column(JSON)  # {"en": "Bacterial Spot", "hi": "बैक्टीरियल स्पॉट"}
     
@@ -37,4 +40,27 @@ class Disease(Base):
     is_active = Column(Boolean, default=True)
 
     def __repr__(self):
-        return f"<Disease(id={self.id}, name={self.name}, plant={self.plant_type})>"
\ No newline at end of file
+        return f"<Disease(id={self.id}, name={self.name}, plant={self.plant_type})>"
+
+class CatalogVersion(Base):
+    """Version stamp bumped whenever a catalog table changes; caches poll it"""
+    __tablename__ = "catalog_versions"
+    
+    name = Column(String(50), primary_key=True)  # table name, e.g. "diseases"
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+def bump_catalog_version(connection, name: str):
+    """Increment the version stamp for `name` on the given connection"""
+    table = CatalogVersion.__table__
+    result = connection.execute(
+        update(table).where(table.c.name == name).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(name=name, version=1))
+
+@event.listens_for(Session, "after_flush")
+def _bump_disease_version(session, flush_context):
+    changed = (session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, Disease) for objs in changed for obj in objs):
+        bump_catalog_version(session.connection(), Disease.__tablename__)
\ No newline at end of file
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, SmallInteger, Float, ForeignKey, Index
+from app.core.database import Base
+
+class DiseaseLabel(Base):
+    """Canonical disease label; IDs are stable across models (see app.ml.labels)"""
+    __tablename__ = "disease_labels"
+    
+    id = Column(SmallInteger, primary_key=True, autoincrement=False)
+    name = Column(String(100), unique=True, nullable=False)  # canonical class name, e.g. "Tomato_Leaf_Mold"
+    plant_type = Column(String(50))
+
+    def __repr__(self):
+        return f"<DiseaseLabel(id={self.id}, name={self.name})>"
+
+class ScanAlternative(Base):
+    """Runner-up diagnoses of a scan by label ID (mirrors PlantScan.alternative_diagnoses)"""
+    __tablename__ = "scan_alternatives"
+    __table_args__ = (
+        Index("ix_scan_alternatives_label", "label_id"),
+    )
+    
+    scan_id = Column(String(36), ForeignKey("plant_scans.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)  # 1 = most likely alternative
+    label_id = Column(SmallInteger, ForeignKey("disease_labels.id"), nullable=False)
+    confidence = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<ScanAlternative(scan_id={self.scan_id}, rank={self.rank}, label_id={self.label_id})>"
\ No newline at end of file
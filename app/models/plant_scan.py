@@ -1,11 +1,23 @@
-from sqlalchemy import Column, String, DateTime, Float, JSON, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, DateTime, Float, JSON, ForeignKey, Text, Boolean, Index, SmallInteger
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
+from datetime import datetime, timezone
 from app.core.database import Base
 
 class PlantScan(Base):
     __tablename__ = "plant_scans"
+    __table_args__ = (
+        # Keyset pagination of a farmer's history. On PostgreSQL the index also
+        # carries the rest of scans.SCAN_LIST_COLUMNS, so history pages are
+        # index-only scans; SQLite has no INCLUDE and reads those from the table.
+        Index(
+            "ix_plant_scans_farmer_created", "farmer_id", "created_at", "id",
+            postgresql_include=["disease_predicted", "confidence", "plant_type", "severity", "image_url"]
+        ),
+        # Nearby queries: one range scan per covering geohash prefix
+        Index("ix_plant_scans_geohash_created", "geohash", "created_at"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     farmer_id = Column(String(36), ForeignKey("farmers.id"), nullable=False)
@@ -15,7 +27,9 @@ class PlantScan(Base):
     image_filename = Column(String(255))
     
     # Prediction results
+    # Model class name as predicted; filter and group on disease_label_id
     disease_predicted = Column(String(100), nullable=False)
+    disease_label_id = Column(SmallInteger, ForeignKey("disease_labels.id"), index=True)
     confidence = Column(Float, nullable=False)  # 0.0 to 1.0
     severity = Column(String(20))  # early, moderate, severe
     
@@ -25,27 +39,33 @@ class PlantScan(Base):
     prevention_tips = Column(JSON)    # {"en": "...", "hi": "...", "te": "..."}
     
     # Additional prediction details
-    alternative_diagnoses = Column(JSON)  # [{"disease": "...", "confidence": 0.xx}, ...]
-    plant_type = Column(String(50))  # Potato, Tomato, Pepper, etc.
+    alternative_diagnoses = Column(JSON)  # [{"disease": "...", "disease_id": n, "confidence": 0.xx}, ...]
+    plant_type = Column(String(50), index=True)  # Potato, Tomato, Pepper, etc.
     affected_part = Column(String(50))  # leaf, stem, fruit, etc.
     
     # Image analysis metadata
     image_quality_score = Column(Float)  # 0.0 to 1.0
     analysis_duration = Column(Float)  # seconds taken for prediction
+    model_version = Column(String(40))  # model that made the prediction
     
     # Farmer feedback
     is_correct_prediction = Column(Boolean, nullable=True)  # True/False/None (not provided)
     farmer_notes = Column(Text)  # Farmer's additional comments
     actual_disease = Column(String(100))  # What farmer says it actually is
     feedback_rating = Column(Float)  # 1-5 stars
+    feedback_region = Column(String(100))  # farmer's state when feedback was first given, for confusion counts
     
     # Location and context
     location = Column(String(255))  # GPS coordinates or location name
+    latitude = Column(Float)
+    longitude = Column(Float)
+    geohash = Column(String(12))  # app.utils.geo.encode_geohash(latitude, longitude)
     weather_conditions = Column(String(100))  # sunny, rainy, humid, etc.
     soil_type = Column(String(50))  # clay, sandy, loamy, etc.
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set client-side so SQLite stores the same text format keyset cursors compare against
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     feedback_provided_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -60,6 +80,7 @@ class PlantScan(Base):
             "image_url": self.image_url,
             "image_filename": self.image_filename,
             "disease_predicted": self.disease_predicted,
+            "disease_label_id": self.disease_label_id,
             "confidence": self.confidence,
             "severity": self.severity,
             "plant_type": self.plant_type,
@@ -70,11 +91,14 @@ class PlantScan(Base):
             "alternative_diagnoses": self.alternative_diagnoses,
             "image_quality_score": self.image_quality_score,
             "analysis_duration": self.analysis_duration,
+            "model_version": self.model_version,
             "is_correct_prediction": self.is_correct_prediction,
             "farmer_notes": self.farmer_notes,
             "actual_disease": self.actual_disease,
             "feedback_rating": self.feedback_rating,
             "location": self.location,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
             "weather_conditions": self.weather_conditions,
             "soil_type": self.soil_type,
             "created_at": self.created_at.isoformat() if self.created_at else None,
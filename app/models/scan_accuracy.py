@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer
+from app.core.database import Base
+
+class ConfusionCount(Base):
+    """Scans with feedback per model version, region, actual and predicted disease"""
+    __tablename__ = "confusion_counts"
+    
+    model_version = Column(String(40), primary_key=True)  # "" when unknown
+    region = Column(String(100), primary_key=True)  # farmer's state, "" when unknown
+    actual = Column(String(100), primary_key=True)  # canonical label per farmer feedback
+    predicted = Column(String(100), primary_key=True)  # canonical label the model chose
+    scan_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ConfusionCount(model={self.model_version}, actual={self.actual}, predicted={self.predicted}, count={self.scan_count})>"
\ No newline at end of file
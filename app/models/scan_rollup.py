@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Date, Integer, Index
+from app.core.database import Base
+
+class ScanDailyRollup(Base):
+    """Scans per day, disease, plant type and region, maintained as scans are written"""
+    __tablename__ = "scan_daily_rollups"
+    __table_args__ = (
+        Index("ix_scan_daily_rollups_disease_day", "disease", "day"),
+        Index("ix_scan_daily_rollups_region_day", "region", "day"),
+    )
+    
+    day = Column(Date, primary_key=True)
+    disease = Column(String(100), primary_key=True)
+    plant_type = Column(String(50), primary_key=True)  # "" when unknown
+    region = Column(String(100), primary_key=True)  # farmer's state, "" when unknown
+    scan_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ScanDailyRollup(day={self.day}, disease={self.disease}, region={self.region}, count={self.scan_count})>"
\ No newline at end of file
@@ -1,19 +1,50 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Index, Float, Integer
 from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, validates
 import uuid
+from datetime import datetime, timezone
 from app.core.database import Base
 
 class Farmer(Base):
     __tablename__ = "farmers"
+    __table_args__ = (
+        # Keyset pagination, unfiltered and by each list filter
+        Index("ix_farmers_created", "created_at", "id"),
+        Index("ix_farmers_language_created", "language", "created_at", "id"),
+        Index("ix_farmers_location_created", "location_state", "location_district", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     phone = Column(String(15), unique=True, nullable=False, index=True)
     name = Column(String(100))
     language = Column(String(10), default="en")  # en, hi, kn, te, ta
     location = Column(JSON)  # Store as {"state": "Karnataka", "district": "Bangalore"}
+    location_state = Column(String(100))  # Copied from location for indexed filtering
+    location_district = Column(String(100))
+    latitude = Column(Float)  # Copied from location["latitude"] / location["longitude"]
+    longitude = Column(Float)
+    hashed_password = Column(String(255))  # bcrypt; None for OTP-only accounts
     is_verified = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    is_active = Column(Boolean, default=True)  # False once deactivated; NULL on rows from before counts as active
+    tokens_valid_after = Column(Integer)  # Unix second; tokens issued at or before it are refused
+    # Set client-side so SQLite stores the same text format keyset cursors compare against
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    scans = relationship("PlantScan", back_populates="farmer")
+
+    @validates("location")
+    def _sync_location_columns(self, key, location):
+        fields = location or {}
+        self.location_state = fields.get("state")
+        self.location_district = fields.get("district")
+        latitude, longitude = fields.get("latitude"), fields.get("longitude")
+        if isinstance(latitude, (int, float)) and isinstance(longitude, (int, float)):
+            self.latitude, self.longitude = float(latitude), float(longitude)
+        else:
+            self.latitude = self.longitude = None
+        return location
 
     def __repr__(self):
         return f"<Farmer(id={self.id}, phone={self.phone}, name={self.name})>"
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class PlantScanBase(BaseModel):
@@ -21,7 +21,22 @@ class PlantScanResponse(PlantScanBase):
     
     class Config:
         from_attributes = True
+        orm_mode = True  # pydantic v1 equivalent of from_attributes
+
+class PlantScanUpdate(BaseModel):
+    is_correct_prediction: Optional[bool] = None
+    actual_disease: Optional[str] = None
+    feedback_rating: Optional[float] = None
+    farmer_notes: Optional[str] = None
 
 class PredictionRequest(BaseModel):
     image_data: str
-    language: str = "en"
\ No newline at end of file
+    language: str = "en"
+
+class PredictionResponse(BaseModel):
+    predicted_disease: str
+    predicted_plant: str
+    confidence: float
+    top_predictions: List[Dict[str, Any]]
+    is_healthy: bool
+    is_supported_plant: bool
\ No newline at end of file
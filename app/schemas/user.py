@@ -9,7 +9,7 @@ class FarmerBase(BaseModel):
     location: Optional[Dict[str, Any]] = None
 
 class FarmerCreate(FarmerBase):
-    pass
+    password: Optional[str] = None
 
 class FarmerUpdate(BaseModel):
     name: Optional[str] = None
@@ -19,11 +19,17 @@ class FarmerUpdate(BaseModel):
 class FarmerResponse(FarmerBase):
     id: str
     is_verified: bool
+    is_active: Optional[bool] = True
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+        orm_mode = True  # pydantic v1 equivalent of from_attributes
+
+class LoginRequest(BaseModel):
+    phone: str
+    password: Optional[str] = None
 
 class Token(BaseModel):
     access_token: str
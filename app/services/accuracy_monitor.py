@@ -0,0 +1,375 @@
+"""
+Confusion matrix of model predictions against farmer feedback, per model
+version and region.
+
+Counts are adjusted in the transaction that records feedback (an ORM
+after_flush hook on PlantScan) and mirrored in memory once it commits, so
+reports never scan plant_scans. A scan's region is its farmer's state when
+feedback is first given, stored in feedback_region, so later changes to the
+feedback adjust the same cells even if the farmer has moved.
+
+    python -m app.services.accuracy_monitor rebuild
+"""
+import argparse
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.ml.labels import get_label_registry
+from app.models.plant_scan import PlantScan
+from app.models.scan_accuracy import ConfusionCount
+from app.models.user import Farmer
+from app.services.scan_archive import get_scan_archive
+
+logger = logging.getLogger(__name__)
+
+CellKey = Tuple[str, str, str, str]  # model_version, region, actual, predicted
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def canonical_label(name: str) -> str:
+    """Canonical label name, so differently spelled feedback lands in one cell"""
+    registry = get_label_registry()
+    return registry.name(registry.resolve(name)) or name
+
+def actual_label(predicted: str, is_correct: Optional[bool], actual_disease: Optional[str]) -> Optional[str]:
+    """What the farmer says the scan shows, or None if the feedback does not say"""
+    if is_correct:
+        return predicted
+    if is_correct is False and actual_disease:
+        return actual_disease
+    return None
+
+def _cell(model_version: Optional[str], region: str, predicted: str, is_correct: Optional[bool],
+          actual_disease: Optional[str]) -> Optional[CellKey]:
+    actual = actual_label(predicted, is_correct, actual_disease)
+    if actual is None:
+        return None
+    return (model_version or "", region, canonical_label(actual), canonical_label(predicted))
+
+def _farmer_regions(conn: Connection, farmer_ids: Iterable[str]) -> Dict[str, str]:
+    farmer_ids = list(set(farmer_ids))
+    if not farmer_ids:
+        return {}
+    rows = conn.execute(select(Farmer.id, Farmer.location_state).where(Farmer.id.in_(farmer_ids))).all()
+    return {farmer_id: state or "" for farmer_id, state in rows}
+
+def apply_deltas(conn: Connection, deltas: Counter):
+    """Add (possibly negative) deltas to confusion_counts, creating missing rows"""
+    values = [
+        {"model_version": v, "region": r, "actual": a, "predicted": p, "scan_count": n}
+        for (v, r, a, p), n in deltas.items() if n
+    ]
+    if not values:
+        return
+    table = ConfusionCount.__table__
+
+    upsert_insert = _UPSERT_INSERTS.get(conn.dialect.name)
+    if upsert_insert is not None:
+        stmt = upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key.columns],
+            set_={"scan_count": table.c.scan_count + stmt.excluded.scan_count}
+        )
+        conn.execute(stmt, values)
+        return
+
+    for row in values:
+        result = conn.execute(
+            update(table)
+            .where(table.c.model_version == row["model_version"], table.c.region == row["region"],
+                   table.c.actual == row["actual"], table.c.predicted == row["predicted"])
+            .values(scan_count=table.c.scan_count + row["scan_count"])
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(table), row)
+
+class AccuracyMonitor:
+    """
+    In-memory copy of confusion_counts.
+
+    Feedback committed in this process is applied right away; a background
+    thread reloads the table every `refresh_interval` seconds to pick up
+    feedback recorded by other processes.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._counts: Dict[CellKey, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def apply(self, deltas: Counter):
+        with self._lock:
+            for key, n in deltas.items():
+                count = self._counts.get(key, 0) + n
+                if count > 0:
+                    self._counts[key] = count
+                else:
+                    self._counts.pop(key, None)
+
+    def refresh(self):
+        """Reload every cell from confusion_counts"""
+        db = SessionLocal()
+        try:
+            rows = db.execute(select(
+                ConfusionCount.model_version, ConfusionCount.region, ConfusionCount.actual,
+                ConfusionCount.predicted, ConfusionCount.scan_count
+            ).where(ConfusionCount.scan_count > 0)).all()
+        finally:
+            db.close()
+        counts = {(v, r, a, p): n for v, r, a, p, n in rows}
+        with self._lock:
+            self._counts = counts
+
+    def model_versions(self) -> List[str]:
+        with self._lock:
+            return sorted({key[0] for key in self._counts})
+
+    def report(self, model_version: Optional[str] = None, region: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Confusion matrix and per-class precision/recall for one model version
+        (all versions if None), in one region or summed over all of them
+        """
+        matrix: Dict[str, Counter] = defaultdict(Counter)  # actual -> predicted -> count
+        with self._lock:
+            for (v, r, actual, predicted), n in self._counts.items():
+                if (model_version is None or v == model_version) and (region is None or r == region):
+                    matrix[actual][predicted] += n
+
+        labels = sorted(set(matrix) | {p for row in matrix.values() for p in row})
+        predicted_totals: Counter = Counter()
+        for row in matrix.values():
+            predicted_totals.update(row)
+        total = sum(predicted_totals.values())
+        correct = sum(matrix[label][label] for label in labels)
+
+        classes = []
+        for label in labels:
+            true_positives = matrix[label][label]
+            support = sum(matrix[label].values())
+            precision = true_positives / predicted_totals[label] if predicted_totals[label] else None
+            recall = true_positives / support if support else None
+            classes.append({
+                "label": label,
+                "support": support,
+                "predicted": predicted_totals[label],
+                "precision": precision,
+                "recall": recall,
+                "f1": 2 * precision * recall / (precision + recall) if precision and recall else None
+            })
+
+        return {
+            "model_version": model_version,
+            "region": region,
+            "total": total,
+            "accuracy": correct / total if total else None,
+            "classes": classes,
+            "labels": labels,
+            "matrix": [[matrix[actual][predicted] for predicted in labels] for actual in labels]
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Confusion count refresh failed: {e}")
+
+    def start(self):
+        """Load the counts and start reloading them periodically"""
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Confusion count load failed: {e}")
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="accuracy-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop reloading"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+# Global instance
+_accuracy_monitor = AccuracyMonitor(settings.ACCURACY_REFRESH_INTERVAL)
+
+def get_accuracy_monitor() -> AccuracyMonitor:
+    """Get the process-wide accuracy monitor"""
+    return _accuracy_monitor
+
+def _previous(state, attribute: str):
+    history = state.attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else None
+
+def _has_feedback(scan: PlantScan) -> bool:
+    return actual_label(scan.disease_predicted, scan.is_correct_prediction, scan.actual_disease) is not None
+
+@event.listens_for(Session, "before_flush")
+def _set_feedback_region(session, flush_context, instances):
+    scans = [
+        obj for obj in session.new | session.dirty
+        if isinstance(obj, PlantScan) and obj.feedback_region is None and _has_feedback(obj)
+    ]
+    if scans:
+        regions = _farmer_regions(session.connection(), (obj.farmer_id for obj in scans))
+        for obj in scans:
+            obj.feedback_region = regions.get(obj.farmer_id, "")
+
+@event.listens_for(Session, "after_flush")
+def _on_session_flush(session, flush_context):
+    changes = []
+    for obj in session.new | session.dirty:
+        if not isinstance(obj, PlantScan):
+            continue
+        state = inspect(obj)
+        if obj in session.new:
+            before = (None, None)
+            old_region = None
+        elif state.attrs.is_correct_prediction.history.has_changes() or state.attrs.actual_disease.history.has_changes():
+            before = (_previous(state, "is_correct_prediction"), _previous(state, "actual_disease"))
+            old_region = _previous(state, "feedback_region")
+        else:
+            continue
+        after = (obj.is_correct_prediction, obj.actual_disease)
+        if before != after:
+            changes.append((obj, before, after, old_region))
+    if not changes:
+        return
+
+    conn = session.connection()
+    # Feedback given before feedback_region existed was counted under the farmer's current state
+    legacy = _farmer_regions(conn, (obj.farmer_id for obj, before, _, region in changes
+                                    if region is None and before != (None, None)))
+    deltas: Counter = Counter()
+    for obj, before, after, old_region in changes:
+        if old_region is None:
+            old_region = legacy.get(obj.farmer_id, "")
+        old = _cell(obj.model_version, old_region, obj.disease_predicted, *before)
+        new = _cell(obj.model_version, obj.feedback_region or "", obj.disease_predicted, *after)
+        if old != new:
+            if old is not None:
+                deltas[old] -= 1
+            if new is not None:
+                deltas[new] += 1
+    apply_deltas(conn, deltas)
+    session.info.setdefault("confusion_deltas", Counter()).update(deltas)
+
+@event.listens_for(Session, "after_commit")
+def _apply_confusion_deltas(session):
+    deltas = session.info.pop("confusion_deltas", None)
+    if deltas:
+        _accuracy_monitor.apply(deltas)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_confusion_deltas(session, previous_transaction):
+    session.info.pop("confusion_deltas", None)
+
+def _archived_counts(conn: Connection) -> Counter:
+    """Confusion cells of archived scans with feedback that are not also still in plant_scans"""
+    archive = get_scan_archive()
+    if not archive.has_data():
+        return Counter()
+    import pyarrow.dataset as ds
+    table = archive.read(
+        ["id", "farmer_id", "model_version", "feedback_region", "disease_predicted",
+         "is_correct_prediction", "actual_disease"],
+        filter=ds.field("is_correct_prediction").is_valid()
+    )
+    scans = {scan["id"]: scan for scan in table.to_pylist()}
+    ids = list(scans)
+    for start in range(0, len(ids), 500):
+        # Left in both places by an interrupted archive run; plant_scans already counted them
+        hot = conn.execute(select(PlantScan.id).where(PlantScan.id.in_(ids[start:start + 500]))).scalars()
+        for scan_id in hot:
+            del scans[scan_id]
+
+    regions = _farmer_regions(conn, (s["farmer_id"] for s in scans.values() if s["feedback_region"] is None))
+    counts: Counter = Counter()
+    for scan in scans.values():
+        region = scan["feedback_region"]
+        if region is None:
+            region = regions.get(scan["farmer_id"], "")
+        key = _cell(scan["model_version"], region, scan["disease_predicted"],
+                    scan["is_correct_prediction"], scan["actual_disease"])
+        if key is not None:
+            counts[key] += 1
+    return counts
+
+def rebuild_confusion_counts() -> int:
+    """
+    Recompute confusion_counts from plant_scans and the scan archive; returns
+    the number of cells written. Scans with feedback but no feedback_region
+    get their farmer's current state first.
+    """
+    db = SessionLocal()
+    db.info["use_writer"] = True
+    try:
+        farmer_state = (
+            select(func.coalesce(Farmer.location_state, ""))
+            .where(Farmer.id == PlantScan.farmer_id)
+            .scalar_subquery()
+        )
+        db.execute(
+            update(PlantScan)
+            .where(PlantScan.is_correct_prediction.isnot(None), PlantScan.feedback_region.is_(None))
+            .values(feedback_region=func.coalesce(farmer_state, ""))
+            .execution_options(synchronize_session=False)
+        )
+        region = func.coalesce(PlantScan.feedback_region, "")
+        rows = db.execute(
+            select(
+                PlantScan.model_version, region, PlantScan.disease_predicted,
+                PlantScan.is_correct_prediction, PlantScan.actual_disease, func.count()
+            )
+            .where(PlantScan.is_correct_prediction.isnot(None))
+            .group_by(PlantScan.model_version, region, PlantScan.disease_predicted,
+                      PlantScan.is_correct_prediction, PlantScan.actual_disease)
+        ).all()
+        counts: Counter = Counter()
+        for model_version, region, predicted, is_correct, actual_disease, n in rows:
+            key = _cell(model_version, region, predicted, is_correct, actual_disease)
+            if key is not None:
+                counts[key] += n
+
+        conn = db.connection()
+        counts.update(_archived_counts(conn))
+        conn.execute(delete(ConfusionCount.__table__))
+        apply_deltas(conn, counts)
+        db.commit()
+        return len(counts)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain confusion_counts")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("rebuild", help="Recompute every cell from plant_scans and the scan archive")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app.core.database import create_tables
+    create_tables()
+    if args.command == "rebuild":
+        logger.info(f"Wrote {rebuild_confusion_counts()} confusion cells")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
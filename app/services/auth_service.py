@@ -1,10 +1,14 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import uuid
 from typing import Optional, Dict, Any
 
 from app.models.user import Farmer
-from app.core.security import verify_password, get_password_hash, generate_otp, validate_phone_number
+from app.core.security import (
+    verify_password, get_password_hash, generate_otp, validate_phone_number, revoke_farmer_tokens
+)
 from app.schemas.user import FarmerCreate, FarmerUpdate
 
 class AuthService:
@@ -109,6 +113,129 @@ class AuthService:
         
         return farmer
 
+class AsyncAuthService:
+    """
+    AuthService for async request handlers; the sync AuthService remains
+    for scripts and background workers
+    """
+    
+    @staticmethod
+    async def create_farmer(db: AsyncSession, farmer_data: FarmerCreate) -> Farmer:
+        """
+        Create a new farmer account
+        """
+        # Validate phone number
+        if not validate_phone_number(farmer_data.phone):
+            raise ValueError("Invalid phone number format")
+        
+        # Check if farmer already exists
+        existing_farmer = await AsyncAuthService.get_farmer_by_phone(db, farmer_data.phone)
+        if existing_farmer:
+            raise ValueError("Farmer with this phone number already exists")
+        
+        # Create new farmer
+        farmer = Farmer(
+            phone=farmer_data.phone,
+            name=farmer_data.name,
+            language=farmer_data.language,
+            location=farmer_data.location
+        )
+        
+        db.add(farmer)
+        await db.commit()
+        await db.refresh(farmer)
+        
+        return farmer
+    
+    @staticmethod
+    async def get_farmer_by_phone(db: AsyncSession, phone: str) -> Optional[Farmer]:
+        """
+        Get farmer by phone number
+        """
+        result = await db.execute(select(Farmer).where(Farmer.phone == phone))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_farmer_by_id(db: AsyncSession, farmer_id: str) -> Optional[Farmer]:
+        """
+        Get farmer by ID
+        """
+        return await db.get(Farmer, farmer_id)
+    
+    @staticmethod
+    async def update_farmer(db: AsyncSession, farmer_id: str, update_data: FarmerUpdate) -> Farmer:
+        """
+        Update farmer profile
+        """
+        farmer = await db.get(Farmer, farmer_id)
+        if not farmer:
+            raise ValueError("Farmer not found")
+        
+        # Update fields if provided
+        update_dict = update_data.dict(exclude_unset=True)
+        for field, value in update_dict.items():
+            setattr(farmer, field, value)
+        
+        await db.commit()
+        await db.refresh(farmer)
+        
+        return farmer
+    
+    @staticmethod
+    async def verify_farmer(db: AsyncSession, farmer_id: str) -> Farmer:
+        """
+        Mark farmer as verified
+        """
+        farmer = await db.get(Farmer, farmer_id)
+        if not farmer:
+            raise ValueError("Farmer not found")
+        
+        farmer.is_verified = True
+        await db.commit()
+        await db.refresh(farmer)
+        
+        return farmer
+    
+    @staticmethod
+    async def deactivate_farmer(db: AsyncSession, farmer_id: str) -> Farmer:
+        """
+        Deactivate a farmer and revoke every token issued to them
+        """
+        farmer = await db.get(Farmer, farmer_id)
+        if not farmer:
+            raise ValueError("Farmer not found")
+        
+        farmer.is_active = False
+        await revoke_farmer_tokens(db, farmer)
+        await db.refresh(farmer)
+        
+        return farmer
+    
+    @staticmethod
+    async def get_or_create_farmer(db: AsyncSession, phone: str, name: Optional[str] = None,
+                                   is_verified: bool = True) -> Farmer:
+        """
+        Get existing farmer or create new one (for OTP login)
+        """
+        farmer = await AsyncAuthService.get_farmer_by_phone(db, phone)
+        
+        if not farmer:
+            # Create new farmer
+            farmer = Farmer(
+                phone=phone,
+                name=name or "New Farmer",
+                is_verified=is_verified
+            )
+            db.add(farmer)
+            await db.commit()
+            await db.refresh(farmer)
+        elif is_verified and not farmer.is_verified:
+            # Mark existing farmer as verified
+            farmer.is_verified = True
+            await db.commit()
+        
+        return farmer
+
 class OTPService:
     
     @staticmethod
@@ -0,0 +1,200 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.http_cache import publish_response, DISEASE_CATALOG
+from app.core.metrics import cache_requests_total
+from app.ml.labels import get_label_registry
+from app.models.disease import Disease, CatalogVersion
+
+logger = logging.getLogger(__name__)
+
+# Localized JSON columns; each holds {"en": ..., "hi": ...}
+LOCALIZED_FIELDS = ("common_names", "symptoms", "organic_treatment", "chemical_treatment", "prevention_tips")
+
+# Multi-language treatment columns copied onto each PlantScan
+SCAN_TREATMENT_FIELDS = ("organic_treatment", "chemical_treatment", "prevention_tips")
+
+# orjson.Fragment (orjson >= 3.9) embeds pre-serialized JSON without re-encoding
+_Fragment = getattr(orjson, "Fragment", None)
+
+def _localize(value: Any, language: str, default_language: str) -> Any:
+    if not isinstance(value, dict):
+        return value
+    if language in value:
+        return value[language]
+    return value.get(default_language)
+
+def _catalog_key(name: Optional[str], label_id: Optional[int] = None) -> Union[int, str, None]:
+    """Label ID for any spelling of a class name; the exact name if it has none"""
+    if label_id is None:
+        label_id = get_label_registry().resolve(name)
+    return label_id if label_id is not None else name
+
+def catalog_response_name(language: str) -> str:
+    """http_cache name of the full catalog in one language"""
+    return f"{DISEASE_CATALOG}:{language}"
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version; swapped in whole on refresh"""
+    __slots__ = ("version", "languages", "fragments", "scan_treatments")
+
+    def __init__(self, version: int, languages: List[str], fragments: Dict[Union[int, str], Dict[str, bytes]],
+                 scan_treatments: Dict[Union[int, str], Dict[str, Any]]):
+        self.version = version
+        self.languages = languages
+        self.fragments = fragments  # catalog key -> language -> serialized entry
+        self.scan_treatments = scan_treatments  # catalog key -> PlantScan treatment columns
+
+_EMPTY_SNAPSHOT = CatalogSnapshot(-1, [], {}, {})
+
+class DiseaseCatalog:
+    """
+    Active Disease rows, loaded once per process and indexed by disease
+    label (so any spelling of a class name finds them) and language.
+
+    Each (disease, language) entry is serialized when the catalog loads, so
+    lookups are a dict access returning ready-made JSON bytes. A background
+    thread polls the diseases version stamp and reloads when it changes.
+    """
+
+    def __init__(self, refresh_interval: float, default_language: str):
+        self.refresh_interval = refresh_interval
+        self.default_language = default_language
+        self._snapshot = _EMPTY_SNAPSHOT
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def languages(self) -> List[str]:
+        return self._snapshot.languages
+
+    def _current_version(self, db) -> int:
+        version = db.execute(
+            select(CatalogVersion.version).where(CatalogVersion.name == Disease.__tablename__)
+        ).scalar()
+        return version or 0
+
+    def _build(self, version: int, diseases: List[Disease]) -> CatalogSnapshot:
+        languages = {self.default_language}
+        for disease in diseases:
+            for field in LOCALIZED_FIELDS:
+                value = getattr(disease, field)
+                if isinstance(value, dict):
+                    languages.update(value)
+        languages = sorted(languages)
+
+        fragments: Dict[Union[int, str], Dict[str, bytes]] = {}
+        scan_treatments: Dict[Union[int, str], Dict[str, Any]] = {}
+        catalogs: Dict[str, List[Dict[str, Any]]] = {language: [] for language in languages}
+        for disease in diseases:
+            key = _catalog_key(disease.name, disease.label_id)
+            if key in fragments:
+                logger.warning(f"Disease {disease.name} duplicates label {key}; keeping the first entry")
+                continue
+            fragments[key] = {}
+            for language in languages:
+                entry = {
+                    "name": disease.name,
+                    "plant_type": disease.plant_type,
+                    "scientific_name": disease.scientific_name,
+                    "common_name": _localize(disease.common_names, language, self.default_language),
+                    "symptoms": _localize(disease.symptoms, language, self.default_language),
+                    "organic_treatment": _localize(disease.organic_treatment, language, self.default_language),
+                    "chemical_treatment": _localize(disease.chemical_treatment, language, self.default_language),
+                    "prevention_tips": _localize(disease.prevention_tips, language, self.default_language),
+                    "is_contagious": disease.is_contagious,
+                    "damage_level": disease.damage_level
+                }
+                fragments[key][language] = orjson.dumps(entry)
+                catalogs[language].append(entry)
+            scan_treatments[key] = {f: getattr(disease, f) for f in SCAN_TREATMENT_FIELDS}
+
+        for language, entries in catalogs.items():
+            publish_response(catalog_response_name(language), {
+                "version": version,
+                "language": language,
+                "diseases": entries
+            })
+        return CatalogSnapshot(version, languages, fragments, scan_treatments)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if the version stamp moved (or `force`); returns True if reloaded"""
+        db = SessionLocal()
+        try:
+            version = self._current_version(db)
+            if not force and version == self._snapshot.version:
+                return False
+            diseases = db.execute(
+                select(Disease).where(Disease.is_active.isnot(False)).order_by(Disease.plant_type, Disease.name)
+            ).scalars().all()
+        finally:
+            db.close()
+
+        self._snapshot = self._build(version, diseases)
+        logger.info(f"Loaded disease catalog version {version} ({len(diseases)} diseases)")
+        return True
+
+    def get_fragment(self, name: str, language: Optional[str] = None) -> Optional[bytes]:
+        """Serialized catalog entry for any spelling of a class name, in `language` if available"""
+        entries = self._snapshot.fragments.get(_catalog_key(name))
+        if entries is None:
+            cache_requests_total.inc("disease_catalog", "miss")
+            return None
+        cache_requests_total.inc("disease_catalog", "hit")
+        return entries.get(language or self.default_language) or entries.get(self.default_language)
+
+    def get_entry(self, name: str, language: Optional[str] = None) -> Optional[Any]:
+        """
+        Catalog entry ready to embed in a response: an orjson.Fragment when
+        supported, otherwise the decoded dict
+        """
+        fragment = self.get_fragment(name, language)
+        if fragment is None:
+            return None
+        return _Fragment(fragment) if _Fragment is not None else orjson.loads(fragment)
+
+    def scan_treatments(self, name: str) -> Dict[str, Any]:
+        """Multi-language treatment columns for a PlantScan of this disease"""
+        return self._snapshot.scan_treatments.get(_catalog_key(name), {})
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Disease catalog refresh failed: {e}")
+
+    def start(self):
+        """Load the catalog and start polling for changes"""
+        try:
+            self.refresh(force=True)
+        except Exception as e:
+            logger.warning(f"Disease catalog load failed: {e}")
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="disease-catalog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+# Global instance
+_disease_catalog = DiseaseCatalog(settings.CATALOG_REFRESH_INTERVAL, settings.CATALOG_DEFAULT_LANGUAGE)
+
+def get_disease_catalog() -> DiseaseCatalog:
+    """Get the process-wide disease catalog"""
+    return _disease_catalog
\ No newline at end of file
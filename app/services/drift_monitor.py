@@ -0,0 +1,240 @@
+"""
+Input drift detection from streaming image statistics.
+
+Each scan's per-channel brightness and model confidence go into fixed-bin
+histograms, one set per time window and region, so memory depends on the
+number of windows and regions kept, not on the number of scans. At most
+`max_regions` regions are tracked at once (plus "all" and "other"), so the
+bound is windows x (max_regions + 2) histograms of 7 x 32 counters. A
+background check compares the most recent windows with the windows just
+before them using the population stability index (PSI).
+
+Every process keeps its own histograms, so with several workers the
+input_drift_score gauge and /drift report describe only the scans that
+worker saw. Each is a sample of the same traffic, which is enough to spot
+drift, but the counts are not totals.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import registry, GaugeFunc
+from app.utils.geo import encode_geohash
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_BINS = 32
+
+# Feature -> (low, high) range of its histogram; values outside land in the edge bins
+FEATURES = {
+    "mean_r": (0.0, 255.0),
+    "mean_g": (0.0, 255.0),
+    "mean_b": (0.0, 255.0),
+    "std_r": (0.0, 128.0),
+    "std_g": (0.0, 128.0),
+    "std_b": (0.0, 128.0),
+    "confidence": (0.0, 1.0),
+}
+_FEATURE_LOW = np.array([low for low, _ in FEATURES.values()])
+_FEATURE_SCALE = np.array([HISTOGRAM_BINS / (high - low) for low, high in FEATURES.values()])
+
+ALL_REGIONS = ""  # every scan is also counted under this region
+OTHER_REGION = "other"  # scans from regions beyond max_regions
+
+def drift_region(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    """Coarse geohash cell used as the drift region, or None without coordinates"""
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude, settings.DRIFT_REGION_PRECISION)
+
+def feature_vector(result: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Histogram features of a predictor result, or None if its statistics are incomplete"""
+    statistics = result.get("image_statistics") or {}
+    channel_mean = statistics.get("channel_mean")
+    channel_std = statistics.get("channel_std")
+    if not channel_mean or not channel_std or len(channel_mean) < 3 or len(channel_std) < 3:
+        return None
+    return np.array([*channel_mean[:3], *channel_std[:3], result.get("confidence", 0.0)])
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two histograms of the same bins"""
+    # Smooth empty bins so one unseen bin does not make the score infinite
+    expected = (expected + 0.5) / (expected.sum() + 0.5 * len(expected))
+    actual = (actual + 0.5) / (actual.sum() + 0.5 * len(actual))
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+class DriftMonitor:
+    """
+    Rolling per-window, per-region histograms of scan features.
+
+    `observe` is cheap (one histogram increment per feature) and safe to
+    call from any thread. Windows older than the reference period are
+    dropped as new ones open, which also frees the region slots only they
+    used.
+    """
+
+    def __init__(self, window_seconds: float, current_windows: int, reference_windows: int,
+                 check_interval: float, threshold: float, min_samples: int, max_regions: int):
+        self.window_seconds = window_seconds
+        self.current_windows = current_windows
+        self.reference_windows = reference_windows
+        self.check_interval = check_interval
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.max_regions = max_regions
+        self._regions = set()  # regions with their own histograms in some kept window
+        self._windows: Dict[int, Dict[str, np.ndarray]] = {}  # window index -> region -> (features, bins)
+        self._lock = threading.Lock()
+        self._report: Dict[str, Any] = {"checked_at": None, "regions": {}}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _window_index(self, now: Optional[float] = None) -> int:
+        return int((now if now is not None else time.time()) // self.window_seconds)
+
+    def observe(self, result: Dict[str, Any], region: Optional[str] = None, now: Optional[float] = None):
+        """Add one prediction result to the current window"""
+        features = feature_vector(result)
+        if features is None:
+            return
+        bins = np.clip(((features - _FEATURE_LOW) * _FEATURE_SCALE).astype(int), 0, HISTOGRAM_BINS - 1)
+        rows = np.arange(len(FEATURES))
+        index = self._window_index(now)
+
+        with self._lock:
+            window = self._windows.get(index)
+            if window is None:
+                window = self._windows[index] = {}
+                oldest = index - self.current_windows - self.reference_windows
+                for stale in [i for i in self._windows if i <= oldest]:
+                    del self._windows[stale]
+                self._regions = {r for w in self._windows.values() for r in w} - {ALL_REGIONS, OTHER_REGION}
+            if region and region not in self._regions:
+                if len(self._regions) < self.max_regions:
+                    self._regions.add(region)
+                else:
+                    region = OTHER_REGION
+            for key in {ALL_REGIONS, region or ALL_REGIONS}:
+                histogram = window.get(key)
+                if histogram is None:
+                    histogram = window[key] = np.zeros((len(FEATURES), HISTOGRAM_BINS), dtype=np.int64)
+                histogram[rows, bins] += 1
+
+    def _sum_windows(self, first: int, last: int) -> Dict[str, np.ndarray]:
+        """Per-region histograms summed over windows first..last (inclusive)"""
+        totals: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for index, window in self._windows.items():
+                if first <= index <= last:
+                    for region, histogram in window.items():
+                        if region in totals:
+                            totals[region] = totals[region] + histogram
+                        else:
+                            totals[region] = histogram.copy()
+        return totals
+
+    def check(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Score every region's recent windows against its reference windows"""
+        index = self._window_index(now)
+        current_first = index - self.current_windows + 1
+        current = self._sum_windows(current_first, index)
+        reference = self._sum_windows(current_first - self.reference_windows, current_first - 1)
+
+        regions = {}
+        for region in sorted(set(current) | set(reference)):
+            current_histogram, reference_histogram = current.get(region), reference.get(region)
+            current_samples = int(current_histogram[0].sum()) if current_histogram is not None else 0
+            reference_samples = int(reference_histogram[0].sum()) if reference_histogram is not None else 0
+            entry = {"current_samples": current_samples, "reference_samples": reference_samples,
+                     "score": None, "drifted": False, "features": {}}
+            if min(current_samples, reference_samples) >= self.min_samples:
+                entry["features"] = {
+                    name: psi(reference_histogram[i], current_histogram[i]) for i, name in enumerate(FEATURES)
+                }
+                entry["score"] = max(entry["features"].values())
+                entry["drifted"] = entry["score"] >= self.threshold
+            regions[region] = entry
+
+        report = {
+            "checked_at": time.time(),
+            "window_seconds": self.window_seconds,
+            "current_windows": self.current_windows,
+            "reference_windows": self.reference_windows,
+            "threshold": self.threshold,
+            "regions": regions
+        }
+        self._report = report
+        drifted = [region or "all" for region, entry in regions.items() if entry["drifted"]]
+        if drifted:
+            logger.warning(f"Input drift detected in regions: {', '.join(drifted)}")
+        return report
+
+    @property
+    def report(self) -> Dict[str, Any]:
+        """Result of the latest check"""
+        return self._report
+
+    def histograms(self, region: str = ALL_REGIONS) -> Dict[str, Dict[str, List[int]]]:
+        """Current and reference histograms of one region, per feature"""
+        index = self._window_index()
+        current_first = index - self.current_windows + 1
+        periods = {
+            "current": self._sum_windows(current_first, index).get(region),
+            "reference": self._sum_windows(current_first - self.reference_windows, current_first - 1).get(region)
+        }
+        return {
+            period: {name: histogram[i].tolist() for i, name in enumerate(FEATURES)} if histogram is not None else {}
+            for period, histogram in periods.items()
+        }
+
+    def scores(self) -> Dict[Tuple[str], float]:
+        """Latest drift score per region, for the metrics gauge"""
+        return {
+            (region or "all",): entry["score"]
+            for region, entry in self._report["regions"].items() if entry["score"] is not None
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.warning(f"Drift check failed: {e}")
+
+    def start(self):
+        """Start the background drift check"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background drift check"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+# Global instance
+_drift_monitor = DriftMonitor(
+    window_seconds=settings.DRIFT_WINDOW_MINUTES * 60,
+    current_windows=settings.DRIFT_CURRENT_WINDOWS,
+    reference_windows=settings.DRIFT_REFERENCE_WINDOWS,
+    check_interval=settings.DRIFT_CHECK_INTERVAL,
+    threshold=settings.DRIFT_PSI_THRESHOLD,
+    min_samples=settings.DRIFT_MIN_SAMPLES,
+    max_regions=settings.DRIFT_MAX_REGIONS
+)
+
+registry.register(GaugeFunc(
+    "input_drift_score", "Largest feature PSI of this process's recent scans against its reference windows",
+    lambda: _drift_monitor.scores(), labelnames=("region",)
+))
+
+def get_drift_monitor() -> DriftMonitor:
+    """Get the process-wide drift monitor"""
+    return _drift_monitor
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Cached farmer totals for list endpoints.
+
+    python -m app.services.farmer_stats backfill-locations
+"""
+import logging
+import sys
+import threading
+from typing import Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import Farmer
+
+logger = logging.getLogger(__name__)
+
+class FarmerCounter:
+    """
+    Total number of farmers, kept without a COUNT(*) per request.
+
+    Inserts committed in this process bump the total right away. A background
+    thread recounts every `refresh_interval` seconds to pick up rows written
+    by other processes and deletions. `total` is None until the first count.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._total: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def total(self) -> Optional[int]:
+        return self._total
+
+    def increment(self, amount: int = 1):
+        with self._lock:
+            if self._total is not None:
+                self._total += amount
+
+    def refresh(self):
+        """Recount the farmers table"""
+        db = SessionLocal()
+        try:
+            total = db.execute(select(func.count()).select_from(Farmer)).scalar_one()
+        finally:
+            db.close()
+        with self._lock:
+            self._total = total
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Farmer count refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        """Start the background recount"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="farmer-counter", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background recount"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+# Global instance
+_farmer_counter = FarmerCounter(settings.FARMER_COUNT_REFRESH_INTERVAL)
+
+def get_farmer_counter() -> FarmerCounter:
+    """Get the process-wide farmer counter"""
+    return _farmer_counter
+
+# Count farmers inserted through any session (sync or async) once committed
+@event.listens_for(Session, "after_flush")
+def _count_new_farmers(session, flush_context):
+    new_farmers = sum(1 for obj in session.new if isinstance(obj, Farmer))
+    if new_farmers:
+        session.info["new_farmers"] = session.info.get("new_farmers", 0) + new_farmers
+
+@event.listens_for(Session, "after_commit")
+def _apply_new_farmers(session):
+    new_farmers = session.info.pop("new_farmers", 0)
+    if new_farmers:
+        _farmer_counter.increment(new_farmers)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_new_farmers(session, previous_transaction):
+    session.info.pop("new_farmers", None)
+
+def backfill_location_columns(batch_size: int = 1000) -> int:
+    """Fill location_state/location_district for farmers created before they existed"""
+    updated = 0
+    last_id = ""
+    db = SessionLocal()
+    try:
+        while True:
+            farmers = db.execute(
+                select(Farmer)
+                .where(Farmer.id > last_id, Farmer.location.isnot(None), Farmer.location_state.is_(None))
+                .order_by(Farmer.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not farmers:
+                break
+            for farmer in farmers:
+                if isinstance(farmer.location, dict):
+                    farmer.location = dict(farmer.location)  # re-runs the column sync
+                    updated += 1
+            db.commit()
+            last_id = farmers[-1].id
+    finally:
+        db.close()
+    return updated
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill-locations"]:
+        sys.exit("usage: python -m app.services.farmer_stats backfill-locations")
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Updated {backfill_location_columns()} farmers")
\ No newline at end of file
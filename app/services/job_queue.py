@@ -0,0 +1,314 @@
+import io
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Any, List
+
+from PIL import Image
+
+from app.core.config import settings
+from app.ml.inference import get_inference_executor
+from app.services.prediction_service import PredictionService
+from app.services.drift_monitor import get_drift_monitor, drift_region
+from app.services.scan_writer import get_scan_buffer
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prediction_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    farmer_id TEXT NOT NULL,
+    image_filename TEXT,
+    latitude REAL,
+    longitude REAL,
+    payload BLOB,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    visible_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    scan_id TEXT,
+    claim_token TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_prediction_jobs_claim
+    ON prediction_jobs (status, priority DESC, created_at);
+"""
+
+# Columns added after the first release, created on existing queue files
+_ADDED_COLUMNS = {"latitude": "REAL", "longitude": "REAL", "claim_token": "TEXT"}
+
+_PUBLIC_COLUMNS = (
+    "id", "status", "priority", "farmer_id", "image_filename", "attempts",
+    "max_attempts", "created_at", "updated_at", "scan_id", "error"
+)
+
+class JobQueue:
+    """
+    Durable prediction job queue backed by a local SQLite file.
+
+    A claimed job stays invisible to other workers for the visibility timeout.
+    If the worker dies before finishing, the job becomes claimable again once
+    the timeout passes. Failed jobs are retried with exponential backoff until
+    `max_attempts` is reached. Higher priority jobs are claimed first.
+    
+    Each claim gets a fresh `claim_token`; complete() and fail() only apply
+    while the token still matches, so a worker that overran the timeout
+    cannot finish a job that has since been handed to another worker.
+    """
+
+    def __init__(self, path: str, visibility_timeout: float, max_attempts: int, retry_delay: float):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(prediction_jobs)")}
+        for name, column_type in _ADDED_COLUMNS.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE prediction_jobs ADD COLUMN {name} {column_type}")
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections must not be shared"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, payload: bytes, farmer_id: str, image_filename: Optional[str] = None,
+                priority: int = 0, latitude: Optional[float] = None,
+                longitude: Optional[float] = None) -> str:
+        """Add a job and return its ID"""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO prediction_jobs (id, status, priority, farmer_id, image_filename, latitude, "
+            "longitude, payload, attempts, max_attempts, visible_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)",
+            (job_id, JOB_QUEUED, priority, farmer_id, image_filename, latitude, longitude, payload,
+             self.max_attempts, now, now, now)
+        )
+        return job_id
+
+    def claim(self) -> Optional[sqlite3.Row]:
+        """
+        Claim the next visible job, or return None if there is nothing to do.
+        Running jobs whose visibility timeout expired are reclaimed.
+        """
+        conn = self._conn()
+        while True:
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, attempts, max_attempts FROM prediction_jobs "
+                    "WHERE status IN (?, ?) AND visible_at <= ? "
+                    "ORDER BY priority DESC, created_at LIMIT 1",
+                    (JOB_QUEUED, JOB_RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                if row["attempts"] >= row["max_attempts"]:
+                    # Last attempt timed out without reporting back
+                    conn.execute(
+                        "UPDATE prediction_jobs SET status = ?, payload = NULL, error = ?, updated_at = ? "
+                        "WHERE id = ?",
+                        (JOB_FAILED, "Visibility timeout exceeded", now, row["id"])
+                    )
+                    conn.execute("COMMIT")
+                    continue
+
+                conn.execute(
+                    "UPDATE prediction_jobs SET status = ?, attempts = attempts + 1, "
+                    "visible_at = ?, updated_at = ?, claim_token = ? WHERE id = ?",
+                    (JOB_RUNNING, now + self.visibility_timeout, now, uuid.uuid4().hex, row["id"])
+                )
+                job = conn.execute(
+                    "SELECT * FROM prediction_jobs WHERE id = ?", (row["id"],)
+                ).fetchone()
+                conn.execute("COMMIT")
+                return job
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def complete(self, job_id: str, claim_token: str, scan_id: str) -> bool:
+        """Mark a claimed job as succeeded and drop its payload; False if the claim was lost"""
+        cursor = self._conn().execute(
+            "UPDATE prediction_jobs SET status = ?, scan_id = ?, payload = NULL, error = NULL, "
+            "claim_token = NULL, updated_at = ? WHERE id = ? AND status = ? AND claim_token = ?",
+            (JOB_SUCCEEDED, scan_id, time.time(), job_id, JOB_RUNNING, claim_token)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, claim_token: str, attempts: int, error: str) -> bool:
+        """
+        Schedule a retry, or mark the job failed once attempts are exhausted.
+        False if the claim was lost.
+        """
+        now = time.time()
+        conn = self._conn()
+        if attempts < self.max_attempts:
+            delay = self.retry_delay * (2 ** (attempts - 1))
+            cursor = conn.execute(
+                "UPDATE prediction_jobs SET status = ?, visible_at = ?, error = ?, claim_token = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND claim_token = ?",
+                (JOB_QUEUED, now + delay, error, now, job_id, JOB_RUNNING, claim_token)
+            )
+        else:
+            cursor = conn.execute(
+                "UPDATE prediction_jobs SET status = ?, payload = NULL, error = ?, claim_token = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND claim_token = ?",
+                (JOB_FAILED, error, now, job_id, JOB_RUNNING, claim_token)
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get job status (without the image payload)"""
+        row = self._conn().execute(
+            f"SELECT {', '.join(_PUBLIC_COLUMNS)} FROM prediction_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def depth(self) -> int:
+        """Number of jobs waiting or running"""
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM prediction_jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RUNNING)
+        ).fetchone()[0]
+
+def _run_prediction(payload: bytes) -> Dict[str, Any]:
+    """Decode an uploaded image and run prediction (runs on the inference thread)"""
+    from app.ml.model_loader import get_predictor  # loads TensorFlow; only workers need it
+    image = Image.open(io.BytesIO(payload))
+    image.load()
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return get_predictor().predict(image)
+
+class PredictionWorkerPool:
+    """
+    Background threads that take jobs off the queue, run them through the
+    predictor and store the result as a PlantScan.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int, poll_interval: float):
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Start worker threads"""
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"prediction-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.workers} prediction job workers")
+
+    def stop(self, timeout: float = 10.0):
+        """Signal workers to stop and wait for in-progress jobs"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim()
+            except Exception as e:
+                logger.error(f"Failed to claim prediction job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self._process(job)
+
+    def _process(self, job: sqlite3.Row):
+        started = time.time()
+        try:
+            result = get_inference_executor().submit(_run_prediction, job["payload"]).result()
+            get_drift_monitor().observe(result, drift_region(job["latitude"], job["longitude"]))
+            values = PredictionService.build_scan_values(
+                result,
+                farmer_id=job["farmer_id"],
+                image_filename=job["image_filename"],
+                analysis_duration=time.time() - started,
+                latitude=job["latitude"],
+                longitude=job["longitude"]
+            )
+        except Exception as e:
+            logger.error(f"Prediction job {job['id']} failed (attempt {job['attempts']}): {str(e)}")
+            self.queue.fail(job["id"], job["claim_token"], job["attempts"], str(e))
+            return
+
+        # The job completes once the buffered scan is committed; the worker
+        # moves on to the next job meanwhile. The scan takes the job's ID, so
+        # if the job is reclaimed before the flush, the retry does not add a
+        # second scan.
+        values["id"] = job["id"]
+        future = get_scan_buffer().submit(values)
+        future.add_done_callback(lambda f: self._on_scan_written(job, f))
+
+    def _on_scan_written(self, job: sqlite3.Row, future):
+        try:
+            completed = self.queue.complete(job["id"], job["claim_token"], future.result())
+        except Exception as e:
+            logger.error(f"Prediction job {job['id']} failed (attempt {job['attempts']}): {str(e)}")
+            completed = self.queue.fail(job["id"], job["claim_token"], job["attempts"], str(e))
+        if not completed:
+            logger.warning(f"Prediction job {job['id']} was reclaimed before attempt {job['attempts']} finished")
+
+# Global instances
+_job_queue: Optional[JobQueue] = None
+_worker_pool: Optional[PredictionWorkerPool] = None
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue, opening it on first use"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            settings.JOB_QUEUE_PATH,
+            visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            retry_delay=settings.JOB_RETRY_DELAY
+        )
+    return _job_queue
+
+def start_workers():
+    """Start background prediction workers on application startup"""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = PredictionWorkerPool(
+            get_job_queue(), settings.JOB_WORKERS, settings.JOB_POLL_INTERVAL
+        )
+        _worker_pool.start()
+
+def stop_workers():
+    """Stop background prediction workers on application shutdown"""
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.stop()
+        _worker_pool = None
\ No newline at end of file
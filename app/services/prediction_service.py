@@ -1,7 +1,11 @@
 from PIL import Image
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional, Tuple
 import logging
-from app.ml.predictor import PlantDiseasePredictor
+from app.ml.labels import get_label_registry
+from app.ml.predictor import PlantDiseasePredictor, SupportedPlant
+from app.models.plant_scan import PlantScan
+from app.services.disease_catalog import get_disease_catalog
+from app.utils.geo import geo_columns
 from app.utils.image_processing import validate_image
 
 logger = logging.getLogger(__name__)
@@ -28,6 +32,43 @@ class PredictionService:
             logger.error(f"Prediction service error: {str(e)}")
             raise
     
-    def get_supported_plants(self) -> List[Dict[str, Any]]:
+    def get_supported_plants(self) -> Tuple[SupportedPlant, ...]:
         """Get list of supported plants and their diseases"""
-        return self.predictor.get_supported_plants()
\ No newline at end of file
+        return self.predictor.get_supported_plants()
+    
+    @staticmethod
+    def build_scan_values(result: Dict[str, Any], farmer_id: str, image_filename: Optional[str] = None,
+                          analysis_duration: Optional[float] = None, latitude: Optional[float] = None,
+                          longitude: Optional[float] = None) -> Dict[str, Any]:
+        """Build PlantScan column values from a predictor result"""
+        registry = get_label_registry()
+        return {
+            **geo_columns(latitude, longitude),
+            **get_disease_catalog().scan_treatments(result["predicted_disease"]),
+            "farmer_id": farmer_id,
+            "image_filename": image_filename,
+            "disease_predicted": result["predicted_disease"],
+            "disease_label_id": result.get("disease_id") or registry.resolve(result["predicted_disease"]),
+            "confidence": result["confidence"],
+            "plant_type": result["predicted_plant"],
+            "alternative_diagnoses": [
+                {
+                    "disease": p["disease"],
+                    "disease_id": p.get("disease_id") or registry.resolve(p["disease"]),
+                    "confidence": p["confidence"]
+                }
+                for p in result["top_predictions"]
+                if p["disease"] != result["predicted_disease"]
+            ],
+            "analysis_duration": analysis_duration,
+            "model_version": result.get("model_version")
+        }
+    
+    @staticmethod
+    def build_scan(result: Dict[str, Any], farmer_id: str, image_filename: Optional[str] = None,
+                   analysis_duration: Optional[float] = None, latitude: Optional[float] = None,
+                   longitude: Optional[float] = None) -> PlantScan:
+        """Build a PlantScan record from a predictor result"""
+        return PlantScan(**PredictionService.build_scan_values(
+            result, farmer_id, image_filename, analysis_duration, latitude, longitude
+        ))
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Daily scan rollups by disease, plant type and region.
+
+Counts are added in the same transaction that inserts the scans: through
+the scan write buffer's flush listener for buffered scans, and an ORM
+after_flush hook for scans added to a session directly.
+
+    python -m app.services.rollups rebuild [--since YYYY-MM-DD]
+"""
+import argparse
+import logging
+from collections import Counter
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.plant_scan import PlantScan
+from app.models.scan_rollup import ScanDailyRollup
+from app.models.user import Farmer
+from app.services.scan_archive import get_scan_archive, hot_cutoff
+from app.services.scan_writer import get_scan_buffer
+
+logger = logging.getLogger(__name__)
+
+RollupKey = Tuple[date, str, str, str]  # day, disease, plant_type, region
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def _scan_day(created_at: Optional[datetime]) -> date:
+    """UTC calendar day of a scan timestamp (naive timestamps are already UTC)"""
+    if created_at is None:
+        return datetime.now(timezone.utc).date()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+def _farmer_regions(conn: Connection, farmer_ids: Iterable[str]) -> Dict[str, str]:
+    farmer_ids = list(set(farmer_ids))
+    if not farmer_ids:
+        return {}
+    rows = conn.execute(
+        select(Farmer.id, Farmer.location_state).where(Farmer.id.in_(farmer_ids))
+    ).all()
+    return {farmer_id: state or "" for farmer_id, state in rows}
+
+def count_scans(conn: Connection, scans: List[Dict[str, Any]]) -> Counter:
+    """Group scan column values into rollup keys"""
+    regions = _farmer_regions(conn, (s["farmer_id"] for s in scans))
+    counts: Counter = Counter()
+    for s in scans:
+        key = (
+            _scan_day(s.get("created_at")),
+            s["disease_predicted"],
+            s.get("plant_type") or "",
+            regions.get(s["farmer_id"], "")
+        )
+        counts[key] += 1
+    return counts
+
+def apply_counts(conn: Connection, counts: Counter):
+    """Add counts to the rollup table, creating missing rows"""
+    if not counts:
+        return
+    table = ScanDailyRollup.__table__
+    values = [
+        {"day": day, "disease": disease, "plant_type": plant_type, "region": region, "scan_count": n}
+        for (day, disease, plant_type, region), n in counts.items()
+    ]
+
+    upsert_insert = _UPSERT_INSERTS.get(conn.dialect.name)
+    if upsert_insert is not None:
+        stmt = upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key.columns],
+            set_={"scan_count": table.c.scan_count + stmt.excluded.scan_count}
+        )
+        conn.execute(stmt, values)
+        return
+
+    for row in values:
+        result = conn.execute(
+            update(table)
+            .where(table.c.day == row["day"], table.c.disease == row["disease"],
+                   table.c.plant_type == row["plant_type"], table.c.region == row["region"])
+            .values(scan_count=table.c.scan_count + row["scan_count"])
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(table), row)
+
+def _on_buffer_flush(db: Session, rows: List[Dict[str, Any]]):
+    conn = db.connection()
+    apply_counts(conn, count_scans(conn, rows))
+
+@event.listens_for(Session, "after_flush")
+def _on_session_flush(session, flush_context):
+    scans = [obj for obj in session.new if isinstance(obj, PlantScan)]
+    if not scans:
+        return
+    conn = session.connection()
+    apply_counts(conn, count_scans(conn, [
+        {
+            "farmer_id": s.farmer_id,
+            "disease_predicted": s.disease_predicted,
+            "plant_type": s.plant_type,
+            "created_at": s.created_at
+        }
+        for s in scans
+    ]))
+
+get_scan_buffer().add_flush_listener(_on_buffer_flush)
+
+def rebuild_rollups(since: Optional[date] = None) -> int:
+    """
+    Recompute rollups from plant_scans, for every day or from `since` on.
+    Days already moved to the scan archive keep their rollups. Returns the
+    number of rollup rows written.
+    """
+    if get_scan_archive().has_data():
+        first_hot_day = hot_cutoff().date()
+        since = max(since, first_hot_day) if since is not None else first_hot_day
+    table = ScanDailyRollup.__table__
+    day = func.date(PlantScan.created_at)
+    query = (
+        select(
+            day,
+            PlantScan.disease_predicted,
+            func.coalesce(PlantScan.plant_type, ""),
+            func.coalesce(Farmer.location_state, ""),
+            func.count()
+        )
+        .select_from(PlantScan)
+        .outerjoin(Farmer, Farmer.id == PlantScan.farmer_id)
+        .group_by(day, PlantScan.disease_predicted,
+                  func.coalesce(PlantScan.plant_type, ""), func.coalesce(Farmer.location_state, ""))
+    )
+    clear = delete(table)
+    if since is not None:
+        query = query.where(PlantScan.created_at >= datetime.combine(since, time.min))
+        clear = clear.where(table.c.day >= since)
+
+    db = SessionLocal()
+    db.info["use_writer"] = True
+    try:
+        db.execute(clear)
+        result = db.execute(insert(table).from_select(
+            ["day", "disease", "plant_type", "region", "scan_count"], query
+        ))
+        db.commit()
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain scan rollup tables")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    rebuild = subcommands.add_parser("rebuild", help="Recompute rollups from plant_scans")
+    rebuild.add_argument("--since", type=date.fromisoformat, default=None,
+                         help="Only rebuild days on or after this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app.core.database import create_tables
+    create_tables()
+    if args.command == "rebuild":
+        rows = rebuild_rollups(args.since)
+        logger.info(f"Rebuilt {rows} rollup rows")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
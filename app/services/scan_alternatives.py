@@ -0,0 +1,79 @@
+"""
+Keeps scan_alternatives in step with PlantScan.alternative_diagnoses, in the
+same transaction that writes the scan.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, exists, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.ml.labels import get_label_registry
+from app.models.disease_label import ScanAlternative
+from app.models.plant_scan import PlantScan
+from app.services.scan_writer import get_scan_buffer
+
+logger = logging.getLogger(__name__)
+
+def alternative_rows(scan_id: str, alternatives: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """scan_alternatives rows for a scan's alternative_diagnoses; unknown labels are skipped"""
+    registry = get_label_registry()
+    rows = []
+    for rank, alternative in enumerate(alternatives or [], start=1):
+        label_id = alternative.get("disease_id") or registry.resolve(alternative.get("disease"))
+        if label_id is not None:
+            rows.append({
+                "scan_id": scan_id,
+                "rank": rank,
+                "label_id": label_id,
+                "confidence": alternative.get("confidence") or 0.0
+            })
+    return rows
+
+def _insert_rows(conn, rows: List[Dict[str, Any]]):
+    if rows:
+        conn.execute(insert(ScanAlternative.__table__), rows)
+
+def _on_buffer_flush(db: Session, scans: List[Dict[str, Any]]):
+    _insert_rows(db.connection(), [
+        row for scan in scans for row in alternative_rows(scan["id"], scan.get("alternative_diagnoses"))
+    ])
+
+@event.listens_for(Session, "after_flush")
+def _on_session_flush(session, flush_context):
+    rows = [
+        row
+        for obj in session.new if isinstance(obj, PlantScan)
+        for row in alternative_rows(obj.id, obj.alternative_diagnoses)
+    ]
+    if rows:
+        _insert_rows(session.connection(), rows)
+
+get_scan_buffer().add_flush_listener(_on_buffer_flush)
+
+def backfill_alternatives(batch_size: int = 1000) -> int:
+    """Create scan_alternatives rows for scans written before the table existed"""
+    written = 0
+    last_id = ""
+    db = SessionLocal()
+    db.info["use_writer"] = True
+    try:
+        while True:
+            scans = db.execute(
+                select(PlantScan.id, PlantScan.alternative_diagnoses)
+                .where(PlantScan.id > last_id)
+                .where(~exists().where(ScanAlternative.scan_id == PlantScan.id))
+                .order_by(PlantScan.id)
+                .limit(batch_size)
+            ).all()
+            if not scans:
+                break
+            rows = [row for scan_id, alternatives in scans for row in alternative_rows(scan_id, alternatives)]
+            _insert_rows(db.connection(), rows)
+            db.commit()
+            written += len(rows)
+            last_id = scans[-1].id
+    finally:
+        db.close()
+    return written
\ No newline at end of file
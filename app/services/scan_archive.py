@@ -0,0 +1,293 @@
+"""
+Moves old scans out of plant_scans into Parquet files and reads them back.
+
+Files are partitioned by month (year=YYYY/month=MM/part-*.parquet) and
+sorted by farmer, with dictionary-encoded disease and plant columns. The
+cutoff is always a month boundary, so a day is either fully hot or fully
+archived. Wide treatment columns are not archived; they come from the
+disease catalog. The latest cutoff used is stored in _cutoff.json at the
+archive root, and hot_cutoff() reads it from there.
+
+    python -m app.services.scan_archive archive [--months N]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.disease_label import ScanAlternative
+from app.models.plant_scan import PlantScan
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; without it nothing is archived
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+CUTOFF_FILE = "_cutoff.json"  # "_" keeps it out of the dataset
+
+ARCHIVE_COLUMNS = (
+    PlantScan.id, PlantScan.farmer_id, PlantScan.created_at, PlantScan.disease_predicted,
+    PlantScan.disease_label_id, PlantScan.confidence, PlantScan.severity, PlantScan.plant_type,
+    PlantScan.affected_part, PlantScan.image_url, PlantScan.image_filename, PlantScan.latitude,
+    PlantScan.longitude, PlantScan.geohash, PlantScan.location, PlantScan.analysis_duration,
+    PlantScan.model_version, PlantScan.is_correct_prediction, PlantScan.actual_disease, PlantScan.feedback_rating,
+    PlantScan.feedback_region
+)
+
+# Low-cardinality strings stored as dictionary indices
+DICTIONARY_COLUMNS = (
+    "disease_predicted", "plant_type", "severity", "affected_part", "model_version", "actual_disease",
+    "feedback_region"
+)
+
+def _archive_schema():
+    string = pa.string()
+    category = pa.dictionary(pa.int16(), pa.string())
+    types = {
+        "id": string, "farmer_id": string, "created_at": pa.timestamp("us", tz="UTC"),
+        "disease_predicted": category, "disease_label_id": pa.int16(), "confidence": pa.float64(),
+        "severity": category, "plant_type": category, "affected_part": category,
+        "image_url": string, "image_filename": string, "latitude": pa.float64(),
+        "longitude": pa.float64(), "geohash": string, "location": string,
+        "analysis_duration": pa.float64(), "model_version": category, "is_correct_prediction": pa.bool_(),
+        "actual_disease": category, "feedback_rating": pa.float64(), "feedback_region": category
+    }
+    return pa.schema([(c.key, types[c.key]) for c in ARCHIVE_COLUMNS])
+
+def months_ago(months: int, now: Optional[datetime] = None) -> datetime:
+    """First instant (UTC) of the calendar month `months` months before now"""
+    now = now or datetime.now(timezone.utc)
+    index = now.year * 12 + now.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def _utc(value: datetime) -> datetime:
+    # Naive timestamps come from SQLite and are already UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+class ScanArchive:
+    """Parquet archive of scans older than the hot-table retention window"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @property
+    def available(self) -> bool:
+        """pyarrow is installed"""
+        return pa is not None
+
+    def has_data(self) -> bool:
+        if not self.available or not os.path.isdir(self.root):
+            return False
+        with os.scandir(self.root) as entries:
+            return any(entry.name.startswith("year=") for entry in entries)
+
+    def cutoff(self) -> Optional[datetime]:
+        """Cutoff of the latest archive run, or None if nothing was ever archived"""
+        try:
+            with open(os.path.join(self.root, CUTOFF_FILE)) as f:
+                return datetime.fromisoformat(json.load(f)["cutoff"])
+        except FileNotFoundError:
+            return None
+
+    def _write_cutoff(self, cutoff: datetime):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, CUTOFF_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"cutoff": _utc(cutoff).isoformat()}, f)
+        os.replace(path + ".tmp", path)
+
+    def _write_partition(self, year: int, month: int, rows: List[Dict[str, Any]]):
+        directory = os.path.join(self.root, f"year={year}", f"month={month:02d}")
+        os.makedirs(directory, exist_ok=True)
+        rows.sort(key=lambda r: (r["farmer_id"], r["created_at"], r["id"]))
+        table = pa.Table.from_pylist(rows, schema=_archive_schema())
+        # Named after its rows, so re-archiving a batch after a crash replaces the file
+        digest = hashlib.sha256("\n".join(sorted(r["id"] for r in rows)).encode()).hexdigest()[:32]
+        name = f"part-{digest}.parquet"
+        # Dot-prefixed files are ignored by readers until renamed into place
+        temporary = os.path.join(directory, f".{name}")
+        pq.write_table(table, temporary, compression="zstd", use_dictionary=list(DICTIONARY_COLUMNS))
+        os.replace(temporary, os.path.join(directory, name))
+
+    def archive(self, older_than: datetime, batch_size: int) -> int:
+        """
+        Move scans created before `older_than` into the archive, one batch per
+        transaction. Files are written before rows are deleted, so a crash in
+        between leaves a scan in both places until the next run rewrites the
+        same file; readers drop duplicate ids meanwhile. The cutoff is
+        recorded first, so readers never skip the archive for a window it
+        may hold.
+        """
+        if not self.available:
+            raise RuntimeError("pyarrow is required for scan archival")
+        previous = self.cutoff()
+        if previous is None or _utc(older_than) > previous:
+            self._write_cutoff(older_than)
+
+        moved = 0
+        while True:
+            db = SessionLocal()
+            db.info["use_writer"] = True
+            try:
+                rows = db.execute(
+                    select(*ARCHIVE_COLUMNS)
+                    .where(PlantScan.created_at < older_than)
+                    .order_by(PlantScan.created_at, PlantScan.id)
+                    .limit(batch_size)
+                ).mappings().all()
+                if not rows:
+                    break
+
+                partitions: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+                for row in rows:
+                    row = dict(row)
+                    row["created_at"] = _utc(row["created_at"])
+                    partitions[(row["created_at"].year, row["created_at"].month)].append(row)
+                for (year, month), partition_rows in partitions.items():
+                    self._write_partition(year, month, partition_rows)
+
+                ids = [row["id"] for row in rows]
+                db.execute(delete(ScanAlternative).where(ScanAlternative.scan_id.in_(ids)))
+                db.execute(delete(PlantScan).where(PlantScan.id.in_(ids)))
+                db.commit()
+                moved += len(ids)
+                logger.info(f"Archived {moved} scans")
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        return moved
+
+    def _dataset(self):
+        partitions = pa.schema([("year", pa.int16()), ("month", pa.int8())])
+        return ds.dataset(
+            self.root, format="parquet", schema=pa.unify_schemas([_archive_schema(), partitions]),
+            partitioning=ds.partitioning(partitions, flavor="hive")
+        )
+
+    @staticmethod
+    def _partition_filter(since: Optional[datetime], until: Optional[datetime]):
+        """Restrict reads to month partitions overlapping [since, until]"""
+        year, month = ds.field("year"), ds.field("month")
+        expression = None
+        if since is not None:
+            since = _utc(since)
+            expression = (year > since.year) | ((year == since.year) & (month >= since.month))
+        if until is not None:
+            until = _utc(until)
+            upper = (year < until.year) | ((year == until.year) & (month <= until.month))
+            expression = upper if expression is None else expression & upper
+        return expression
+
+    def _scan_filter(self, filter, since: Optional[datetime], until: Optional[datetime]):
+        partition_filter = self._partition_filter(since, until)
+        if partition_filter is None:
+            return filter
+        return partition_filter if filter is None else filter & partition_filter
+
+    def read(self, columns: Sequence[str], filter=None, since: Optional[datetime] = None,
+             until: Optional[datetime] = None):
+        """Archived scans as a pyarrow Table, pruned to months in [since, until]; check has_data() first"""
+        return self._dataset().to_table(columns=list(columns), filter=self._scan_filter(filter, since, until))
+
+    def batches(self, columns: Sequence[str], filter=None, batch_size: int = 10000,
+                since: Optional[datetime] = None, until: Optional[datetime] = None):
+        """
+        Archived scans as a stream of pyarrow RecordBatches of at most
+        `batch_size` rows, for reads too large to hold as one Table
+        """
+        return self._dataset().to_batches(
+            columns=list(columns), filter=self._scan_filter(filter, since, until), batch_size=batch_size
+        )
+
+    def nearby(self, since: datetime, geohash_ranges: Sequence[Tuple[str, Optional[str]]],
+               bbox: Tuple[float, float, float, float]) -> List[Tuple[str, str, float, float]]:
+        """(id, disease, latitude, longitude) of archived scans since `since` in the geohash ranges and bbox"""
+        if not self.has_data():
+            return []
+        geohash = ds.field("geohash")
+        in_cells = None
+        for low, high in geohash_ranges:
+            cell = geohash >= low if high is None else (geohash >= low) & (geohash < high)
+            in_cells = cell if in_cells is None else in_cells | cell
+        lat_min, lat_max, lon_min, lon_max = bbox
+        filter = (
+            in_cells
+            & (ds.field("created_at") >= pa.scalar(_utc(since), type=pa.timestamp("us", tz="UTC")))
+            & (ds.field("latitude") >= lat_min) & (ds.field("latitude") <= lat_max)
+            & (ds.field("longitude") >= lon_min) & (ds.field("longitude") <= lon_max)
+        )
+        table = self.read(["id", "disease_predicted", "latitude", "longitude"], filter=filter, since=since)
+        rows = zip(*(table.column(c).to_pylist() for c in table.column_names))
+        return list({row[0]: row for row in rows}.values())
+
+    def farmer_history(self, farmer_id: str, columns: Sequence[str], limit: int,
+                       before: Optional[Tuple[datetime, str]] = None) -> List[Dict[str, Any]]:
+        """A farmer's archived scans, newest first, strictly before the (created_at, id) key"""
+        if not self.has_data():
+            return []
+        filter = ds.field("farmer_id") == farmer_id
+        until = None
+        if before is not None:
+            created_at = pa.scalar(_utc(before[0]), type=pa.timestamp("us", tz="UTC"))
+            filter = filter & (
+                (ds.field("created_at") < created_at)
+                | ((ds.field("created_at") == created_at) & (ds.field("id") < before[1]))
+            )
+            until = before[0]
+
+        columns = list(dict.fromkeys([*columns, "created_at", "id"]))
+        table = self.read(columns, filter=filter, until=until)
+        table = table.take(pc.sort_indices(table, [("created_at", "descending"), ("id", "descending")]))
+        scans, seen = [], set()
+        for scan in table.to_pylist():
+            if scan["id"] not in seen:
+                seen.add(scan["id"])
+                scans.append(scan)
+                if len(scans) == limit:
+                    break
+        return scans
+
+# Global instance
+_scan_archive = ScanArchive(settings.SCAN_ARCHIVE_DIR)
+
+def get_scan_archive() -> ScanArchive:
+    """Get the process-wide scan archive"""
+    return _scan_archive
+
+def hot_cutoff() -> datetime:
+    """Scans created before this may live in the archive instead of plant_scans"""
+    return get_scan_archive().cutoff() or months_ago(settings.SCAN_ARCHIVE_AFTER_MONTHS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old scans to Parquet")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    archive = subcommands.add_parser("archive", help="Move scans older than N months to the archive")
+    archive.add_argument("--months", type=int, default=settings.SCAN_ARCHIVE_AFTER_MONTHS)
+    archive.add_argument("--batch-size", type=int, default=settings.SCAN_ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app.core.database import create_tables
+    create_tables()
+    if args.command == "archive":
+        cutoff = months_ago(args.months)
+        moved = get_scan_archive().archive(cutoff, args.batch_size)
+        logger.info(f"Moved {moved} scans created before {cutoff:%Y-%m-%d} to {settings.SCAN_ARCHIVE_DIR}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
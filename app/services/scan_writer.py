@@ -0,0 +1,211 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import registry, Counter, Histogram, GaugeFunc
+from app.models.plant_scan import PlantScan
+
+logger = logging.getLogger(__name__)
+
+# Called with (session, rows) inside the flush transaction, before commit
+FlushListener = Callable[[Session, List[Dict[str, Any]]], None]
+
+PendingRow = Tuple[Dict[str, Any], Optional[Future]]
+
+scan_buffer_flush_size = registry.register(Histogram(
+    "scan_buffer_flush_size", "Scans written per write-behind flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000)
+))
+scan_buffer_rows_total = registry.register(Counter(
+    "scan_buffer_rows_total", "Buffered scans by outcome (written/rejected/dropped)",
+    ("result",)
+))
+
+class ScanWriteBuffer:
+    """
+    Collects PlantScan inserts and writes them in bulk.
+
+    Rows get their ID and created_at on the client, so callers can return the
+    scan ID immediately. A background thread flushes once `max_batch` rows are
+    pending or `flush_interval` seconds have passed, in a single transaction.
+    Rows whose ID is already in plant_scans are treated as written, so a
+    caller that picks its own ID can safely submit the same scan twice.
+
+    If a batch fails on a row (e.g. a foreign key violation), it is split in
+    halves until the bad rows are isolated; only those are rejected. If it
+    fails because the database is unreachable or busy, the rows are retried
+    on the next flush until `max_pending` rows are waiting, after which the
+    oldest are dropped.
+    """
+
+    def __init__(self, max_batch: int, flush_interval: float, max_pending: int):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[PendingRow] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._listeners: List[FlushListener] = []
+        self._thread = None
+
+    def add_flush_listener(self, listener: FlushListener):
+        """Run `listener(session, rows)` in every flush transaction"""
+        self._listeners.append(listener)
+
+    def _enqueue(self, values: Dict[str, Any], future: Optional[Future]) -> str:
+        row = dict(values)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.now(timezone.utc))
+        with self._lock:
+            self._pending.append((row, future))
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wakeup.set()
+        return row["id"]
+
+    def add(self, values: Dict[str, Any]) -> str:
+        """Buffer a scan (PlantScan column values) and return its ID"""
+        return self._enqueue(values, None)
+
+    def submit(self, values: Dict[str, Any]) -> Future:
+        """Buffer a scan and return a future resolving to its ID once committed"""
+        future = Future()
+        self._enqueue(values, future)
+        return future
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending scans now; returns the number written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            return self._write_or_split(batch)
+
+    def _write_or_split(self, batch: List[PendingRow]) -> int:
+        try:
+            written = self._write(batch)
+        except Exception as e:
+            if _is_transient(e):
+                self._requeue(batch, e)
+                return 0
+            if len(batch) == 1:
+                self._reject(batch[0], e)
+                return 0
+            middle = len(batch) // 2
+            return self._write_or_split(batch[:middle]) + self._write_or_split(batch[middle:])
+
+        scan_buffer_flush_size.observe(written)
+        scan_buffer_rows_total.inc("written", amount=written)
+        for row, future in batch:
+            if future is not None:
+                future.set_result(row["id"])
+        return written
+
+    def _write(self, batch: List[PendingRow]) -> int:
+        """Insert the rows of `batch` not yet in plant_scans in one transaction"""
+        rows, ids = [], set()
+        for row, _ in batch:
+            if row["id"] not in ids:
+                ids.add(row["id"])
+                rows.append(row)
+        db = SessionLocal()
+        db.info["use_writer"] = True
+        try:
+            existing = set(db.execute(
+                select(PlantScan.id).where(PlantScan.id.in_(ids))
+            ).scalars())
+            rows = [row for row in rows if row["id"] not in existing]
+            if rows:
+                db.bulk_insert_mappings(PlantScan, rows)
+                for listener in self._listeners:
+                    listener(db, rows)
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _reject(self, item: PendingRow, error: Exception):
+        row, future = item
+        logger.error(f"Rejected buffered scan {row['id']} (farmer {row.get('farmer_id')}): {error}")
+        scan_buffer_rows_total.inc("rejected")
+        if future is not None:
+            future.set_exception(error)
+
+    def _requeue(self, batch: List[PendingRow], error: Exception):
+        with self._lock:
+            self._pending = batch + self._pending
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                dropped, self._pending = self._pending[:overflow], self._pending[overflow:]
+            else:
+                dropped = []
+        logger.error(f"Failed to write {len(batch)} buffered scans, dropping {len(dropped)}: {error}")
+        if dropped:
+            scan_buffer_rows_total.inc("dropped", amount=len(dropped))
+        for _, future in dropped:
+            if future is not None:
+                future.set_exception(error)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Scan buffer flush failed: {e}")
+
+    def start(self):
+        """Start the background flusher"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="scan-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write whatever is still pending"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed write is worth retrying as is (lost connection, locked database)"""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (OperationalError, InterfaceError))
+
+# Global instance
+_scan_buffer = ScanWriteBuffer(
+    settings.SCAN_BUFFER_MAX_BATCH, settings.SCAN_BUFFER_FLUSH_INTERVAL, settings.SCAN_BUFFER_MAX_PENDING
+)
+
+registry.register(GaugeFunc(
+    "scan_buffer_pending", "Scans waiting in the write-behind buffer",
+    lambda: _scan_buffer.pending
+))
+
+def get_scan_buffer() -> ScanWriteBuffer:
+    """Get the process-wide scan write buffer"""
+    return _scan_buffer
\ No newline at end of file
@@ -7,6 +7,7 @@ from io import BytesIO
 from PIL import Image
 
 from app.core.config import settings
+from app.core.tracing import span
 
 class StorageService:
     
@@ -135,8 +136,9 @@ class LocalStorageService:
             
             # Save file
             contents = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(contents)
+            with span("storage.write", provider="local", bytes=len(contents)):
+                with open(file_path, "wb") as f:
+                    f.write(contents)
             
             # Return relative path
             return f"/{upload_dir}/{filename}"
@@ -3,7 +3,9 @@ from .image_processing import (
     validate_image,
     enhance_image,
     convert_to_rgb,
-    get_image_statistics
+    get_image_statistics,
+    get_array_statistics,
+    decode_raw_tensor
 )
 
 __all__ = [
@@ -11,5 +13,7 @@ __all__ = [
     "validate_image", 
     "enhance_image",
     "convert_to_rgb",
-    "get_image_statistics"
+    "get_image_statistics",
+    "get_array_statistics",
+    "decode_raw_tensor"
 ]
\ No newline at end of file
@@ -0,0 +1,118 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_INDEX = {c: i for i, c in enumerate(_BASE32)}
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m cells, stored on every located scan
+MAX_COVERING_CELLS = 16
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash of a point; nearby points share prefixes"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(lat_degrees, lon_degrees) spanned by a cell at this precision"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) enclosing a circle; longitudes are not wrapped"""
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(latitude))
+    d_lon = 180.0 if cos_lat < 1e-9 else min(180.0, d_lat / cos_lat)
+    return (
+        max(-90.0, latitude - d_lat), min(90.0, latitude + d_lat),
+        max(-180.0, longitude - d_lon), min(180.0, longitude + d_lon)
+    )
+
+def covering_cells(latitude: float, longitude: float, radius_km: float,
+                   max_cells: int = MAX_COVERING_CELLS) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover the circle, using the finest
+    precision that needs at most `max_cells` of them.
+    """
+    lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, radius_km)
+    cells = [""]
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lat_step, lon_step = cell_size(precision)
+        rows = math.floor((lat_max + 90.0) / lat_step) - math.floor((lat_min + 90.0) / lat_step) + 1
+        cols = math.floor((lon_max + 180.0) / lon_step) - math.floor((lon_min + 180.0) / lon_step) + 1
+        if rows * cols > max_cells:
+            break
+        cells = sorted({
+            encode_geohash(
+                min(lat_max, lat_min + i * lat_step), min(lon_max, lon_min + j * lon_step), precision
+            )
+            for i in range(rows + 1)
+            for j in range(cols + 1)
+        })
+    return cells
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Smallest geohash string greater than every hash starting with `prefix`,
+    so a prefix match becomes `prefix <= geohash < bound`. None if unbounded.
+    """
+    chars = list(prefix)
+    while chars:
+        index = _BASE32_INDEX[chars[-1]]
+        if index + 1 < len(_BASE32):
+            chars[-1] = _BASE32[index + 1]
+            return "".join(chars)
+        chars.pop()
+    return None
+
+def prefix_ranges(prefixes: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """
+    [low, high) geohash ranges matching any of the prefixes, with adjacent
+    prefixes merged into one range
+    """
+    ranges: List[Tuple[str, Optional[str]]] = []
+    for prefix in sorted(prefixes):
+        upper = prefix_upper_bound(prefix)
+        if ranges and ranges[-1][1] is not None and ranges[-1][1] >= prefix:
+            low, high = ranges[-1]
+            ranges[-1] = (low, None if upper is None else max(high, upper))
+        else:
+            ranges.append((prefix, upper))
+    return ranges
+
+def geo_columns(latitude: Optional[float], longitude: Optional[float]) -> Dict[str, Optional[object]]:
+    """latitude/longitude/geohash column values for a scan"""
+    if latitude is None or longitude is None:
+        return {"latitude": None, "longitude": None, "geohash": None}
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError("Coordinates out of range")
+    return {"latitude": latitude, "longitude": longitude, "geohash": encode_geohash(latitude, longitude)}
\ No newline at end of file
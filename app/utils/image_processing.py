@@ -2,11 +2,20 @@ import cv2
 import numpy as np
 from PIL import Image, ImageEnhance
 import io
+import struct
 from typing import Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Raw tensor upload format: header followed by uint8 RGB pixels in row-major order
+#   magic (4s) | version (B) | dtype (B) | width (H) | height (H), little-endian
+RAW_TENSOR_MAGIC = b"PDRT"
+RAW_TENSOR_VERSION = 1
+RAW_TENSOR_DTYPE_UINT8 = 1
+RAW_TENSOR_HEADER = struct.Struct("<4sBBHH")
+RAW_TENSOR_CONTENT_TYPE = "application/x-plantdoc-tensor"
+
 def preprocess_image(image: Image.Image, target_size: Tuple[int, int] = (224, 224)) -> np.ndarray:
     """
     Preprocess image for model prediction.
@@ -123,6 +132,38 @@ def convert_to_rgb(image: Image.Image) -> Image.Image:
     else:
         return image.convert('RGB')
 
+def decode_raw_tensor(payload: bytes, expected_size: Tuple[int, int]) -> np.ndarray:
+    """
+    Decode a raw tensor upload without copying the pixels.
+    
+    Args:
+        payload: Header followed by height * width * 3 uint8 RGB bytes
+        expected_size: Model input size (height, width)
+    
+    Returns:
+        Read-only uint8 array of shape (height, width, 3)
+    """
+    if len(payload) < RAW_TENSOR_HEADER.size:
+        raise ValueError("Payload shorter than raw tensor header")
+    
+    magic, version, dtype, width, height = RAW_TENSOR_HEADER.unpack_from(payload)
+    if magic != RAW_TENSOR_MAGIC:
+        raise ValueError("Not a raw tensor payload")
+    if version != RAW_TENSOR_VERSION:
+        raise ValueError(f"Unsupported raw tensor version: {version}")
+    if dtype != RAW_TENSOR_DTYPE_UINT8:
+        raise ValueError(f"Unsupported raw tensor dtype: {dtype}")
+    if (height, width) != tuple(expected_size):
+        raise ValueError(
+            f"Raw tensor is {width}x{height}, model expects {expected_size[1]}x{expected_size[0]}"
+        )
+    
+    expected_length = RAW_TENSOR_HEADER.size + height * width * 3
+    if len(payload) != expected_length:
+        raise ValueError(f"Raw tensor payload is {len(payload)} bytes, expected {expected_length}")
+    
+    return np.frombuffer(payload, dtype=np.uint8, offset=RAW_TENSOR_HEADER.size).reshape(height, width, 3)
+
 def get_image_statistics(image: Image.Image) -> dict:
     """
     Get basic statistics about the image.
@@ -134,17 +175,40 @@ def get_image_statistics(image: Image.Image) -> dict:
         Dictionary containing image statistics
     """
     try:
-        img_array = np.array(image)
-        
+        return get_array_statistics(np.array(image), mode=image.mode, dimensions=image.size)
+    except Exception as e:
+        logger.error(f"Error getting image statistics: {str(e)}")
+        return {'error': str(e)}
+
+def get_array_statistics(img_array: np.ndarray, mode: str = "RGB",
+                         dimensions: Optional[Tuple[int, int]] = None) -> dict:
+    """
+    Get basic statistics about an image already in array form.
+    
+    Args:
+        img_array: Pixel array of shape (height, width[, channels])
+        mode: Image mode of the array
+        dimensions: (width, height); derived from the array if omitted
+    
+    Returns:
+        Dictionary containing image statistics
+    """
+    try:
         stats = {
-            'dimensions': image.size,
-            'mode': image.mode,
+            'dimensions': dimensions or (img_array.shape[1], img_array.shape[0]),
+            'mode': mode,
             'mean_brightness': float(np.mean(img_array)),
             'std_brightness': float(np.std(img_array)),
             'min_pixel': int(np.min(img_array)),
             'max_pixel': int(np.max(img_array))
         }
         
+        # Per-channel mean and std, e.g. [R, G, B]
+        if img_array.ndim == 3:
+            pixels = img_array.reshape(-1, img_array.shape[2])
+            stats['channel_mean'] = pixels.mean(axis=0).tolist()
+            stats['channel_std'] = pixels.std(axis=0).tolist()
+        
         return stats
         
     except Exception as e:
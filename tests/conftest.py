@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point them at scratch files before any app import
+_scratch = tempfile.mkdtemp(prefix="plantdoctor-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_scratch}/test.db")
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(_scratch, "jobs.db"))
+os.environ.setdefault("SCAN_ARCHIVE_DIR", os.path.join(_scratch, "scan_archive"))
\ No newline at end of file
@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.database import SessionLocal, create_tables
+from app.models.plant_scan import PlantScan
+from app.models.scan_accuracy import ConfusionCount
+from app.models.user import Farmer
+from app.services.accuracy_monitor import canonical_label, rebuild_confusion_counts
+from app.services.scan_archive import get_scan_archive
+
+LATE_BLIGHT = canonical_label("Tomato___Late_blight")
+EARLY_BLIGHT = canonical_label("Tomato___Early_blight")
+
+@pytest.fixture
+def scan():
+    """A Telangana farmer's unreviewed scan, under a model version of its own"""
+    create_tables()
+    key = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        db.add(Farmer(id=f"farmer-{key}", phone=f"555{key}", name="A", location={"state": "Telangana"}))
+        db.add(PlantScan(id=f"scan-{key}", farmer_id=f"farmer-{key}", disease_predicted="Tomato___Late_blight",
+                         confidence=0.7, model_version=f"model-{key}", created_at=datetime.now(timezone.utc)))
+        db.commit()
+    finally:
+        db.close()
+    return key
+
+def cells(key):
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(ConfusionCount.region, ConfusionCount.actual, ConfusionCount.predicted, ConfusionCount.scan_count)
+            .where(ConfusionCount.model_version == f"model-{key}", ConfusionCount.scan_count != 0)
+        ).all()
+        return {(region, actual, predicted): n for region, actual, predicted, n in rows}
+    finally:
+        db.close()
+
+def update(model, row_id, **values):
+    db = SessionLocal()
+    try:
+        obj = db.get(model, row_id)
+        for name, value in values.items():
+            setattr(obj, name, value)
+        db.commit()
+    finally:
+        db.close()
+
+def test_feedback_stays_in_its_region_after_farmer_moves(scan):
+    update(PlantScan, f"scan-{scan}", is_correct_prediction=True)
+    assert cells(scan) == {("Telangana", LATE_BLIGHT, LATE_BLIGHT): 1}
+
+    update(Farmer, f"farmer-{scan}", location={"state": "Punjab"})
+    update(PlantScan, f"scan-{scan}", is_correct_prediction=False, actual_disease="Tomato___Early_blight")
+    assert cells(scan) == {("Telangana", EARLY_BLIGHT, LATE_BLIGHT): 1}
+
+    incremental = cells(scan)
+    rebuild_confusion_counts()
+    assert cells(scan) == incremental
+
+def test_rebuild_keeps_archived_feedback(scan):
+    pytest.importorskip("pyarrow")
+    update(PlantScan, f"scan-{scan}", is_correct_prediction=True, created_at=datetime(2020, 3, 1, tzinfo=timezone.utc))
+    get_scan_archive().archive(datetime(2021, 1, 1, tzinfo=timezone.utc), batch_size=10)
+
+    rebuild_confusion_counts()
+    assert cells(scan) == {("Telangana", LATE_BLIGHT, LATE_BLIGHT): 1}
\ No newline at end of file
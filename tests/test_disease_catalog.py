@@ -0,0 +1,13 @@
+from app.models.disease import Disease
+from app.services.disease_catalog import DiseaseCatalog
+
+def test_lookups_accept_any_spelling_of_the_class_name():
+    catalog = DiseaseCatalog(refresh_interval=60, default_language="en")
+    disease = Disease(name="Potato_Early_blight", plant_type="Potato",
+                      organic_treatment={"en": "Neem oil"}, is_contagious=True)
+    catalog._snapshot = catalog._build(1, [disease])
+
+    assert catalog.scan_treatments("Potato___Early_blight")["organic_treatment"] == {"en": "Neem oil"}
+    assert catalog.get_fragment("potato early blight") is not None
+    assert catalog.get_fragment("Potato_Late_blight") is None
+    assert catalog.scan_treatments("Unknown_class") == {}
\ No newline at end of file
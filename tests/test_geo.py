@@ -0,0 +1,45 @@
+import math
+import random
+
+import pytest
+
+from app.utils.geo import (
+    covering_cells, encode_geohash, haversine_km, prefix_ranges, prefix_upper_bound, MAX_COVERING_CELLS
+)
+
+def test_encode_known_hashes():
+    assert encode_geohash(42.6, -5.6, 5) == "ezs42"
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+def test_prefix_upper_bound():
+    assert prefix_upper_bound("u4p") == "u4q"
+    assert prefix_upper_bound("u4z") == "u5"
+    assert prefix_upper_bound("zz") is None
+
+def test_prefix_ranges_merge_adjacent_prefixes():
+    assert prefix_ranges(["u4q", "u4p", "u6"]) == [("u4p", "u4r"), ("u6", "u7")]
+    assert prefix_ranges(["z"]) == [("z", None)]
+
+def in_ranges(geohash, ranges):
+    return any(low <= geohash and (high is None or geohash < high) for low, high in ranges)
+
+@pytest.mark.parametrize("latitude, longitude, radius_km", [
+    (17.385, 78.4867, 5.0),    # Hyderabad
+    (28.6139, 77.209, 25.0),   # Delhi
+    (0.0001, -0.0001, 3.0),    # straddles the equator and prime meridian
+    (45.0, 179.99, 10.0),      # next to the antimeridian
+])
+def test_covering_cells_contain_every_point_in_radius(latitude, longitude, radius_km):
+    cells = covering_cells(latitude, longitude, radius_km)
+    assert 0 < len(cells) <= MAX_COVERING_CELLS
+    ranges = prefix_ranges(cells)
+
+    rng = random.Random(42)
+    for _ in range(500):
+        distance = radius_km * math.sqrt(rng.random())
+        bearing = rng.uniform(0, 2 * math.pi)
+        lat = latitude + math.degrees(distance / 6371.0088) * math.cos(bearing)
+        lon = longitude + math.degrees(distance / 6371.0088) * math.sin(bearing) / math.cos(math.radians(latitude))
+        if not -180.0 <= lon <= 180.0 or haversine_km(latitude, longitude, lat, lon) > radius_km:
+            continue  # longitudes are not wrapped at the antimeridian
+        assert in_ranges(encode_geohash(lat, lon), ranges)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from app.services.job_queue import JobQueue, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), visibility_timeout=60, max_attempts=2, retry_delay=0.01)
+
+def test_claim_and_complete(queue):
+    job_id = queue.enqueue(b"image", "farmer-1")
+    job = queue.claim()
+    assert job["id"] == job_id
+    assert job["status"] == JOB_RUNNING
+    assert queue.claim() is None  # invisible while running
+
+    assert queue.complete(job_id, job["claim_token"], "scan-1")
+    stored = queue.get(job_id)
+    assert stored["status"] == JOB_SUCCEEDED
+    assert stored["scan_id"] == "scan-1"
+
+def test_higher_priority_claimed_first(queue):
+    queue.enqueue(b"a", "farmer-1")
+    urgent = queue.enqueue(b"b", "farmer-1", priority=5)
+    assert queue.claim()["id"] == urgent
+
+def test_failure_retries_then_gives_up(queue):
+    job_id = queue.enqueue(b"image", "farmer-1")
+    job = queue.claim()
+    assert queue.fail(job_id, job["claim_token"], job["attempts"], "boom")
+    assert queue.get(job_id)["status"] == JOB_QUEUED
+
+    time.sleep(0.02)  # retry backoff
+    job = queue.claim()
+    assert job["attempts"] == 2
+    assert queue.fail(job_id, job["claim_token"], job["attempts"], "boom again")
+    stored = queue.get(job_id)
+    assert stored["status"] == JOB_FAILED
+    assert stored["error"] == "boom again"
+
+def test_expired_claim_is_reclaimed_and_stale_worker_cannot_finish(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), visibility_timeout=0.01, max_attempts=3, retry_delay=0.01)
+    job_id = queue.enqueue(b"image", "farmer-1")
+    stale = queue.claim()
+    time.sleep(0.02)
+
+    fresh = queue.claim()
+    assert fresh["id"] == job_id
+    assert fresh["claim_token"] != stale["claim_token"]
+
+    assert not queue.complete(job_id, stale["claim_token"], "duplicate-scan")
+    assert not queue.fail(job_id, stale["claim_token"], stale["attempts"], "late")
+    assert queue.complete(job_id, fresh["claim_token"], "scan-1")
+    assert queue.get(job_id)["scan_id"] == "scan-1"
+
+def test_last_attempt_timing_out_fails_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), visibility_timeout=0.01, max_attempts=1, retry_delay=0.01)
+    job_id = queue.enqueue(b"image", "farmer-1")
+    queue.claim()
+    time.sleep(0.02)
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == JOB_FAILED
\ No newline at end of file
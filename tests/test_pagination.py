@@ -0,0 +1,50 @@
+import asyncio
+import base64
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+import app.models  # noqa: F401  (registers every table)
+from app.api.endpoints.scans import list_farmer_scans
+from app.core.database import AsyncSessionLocal, SessionLocal, create_tables
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.plant_scan import PlantScan
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, "scan-1")) == (created_at, "scan-1")
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", base64.urlsafe_b64encode(b'["yesterday", "scan-1"]').decode()])
+def test_malformed_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def list_scans(farmer_id, limit, cursor=None):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            response = await list_farmer_scans(farmer_id, limit=limit, cursor=cursor, db=db)
+        return response.body
+    return orjson.loads(asyncio.run(run()))
+
+def test_keyset_pages_cover_every_scan_once():
+    create_tables()
+    # Two scans share each timestamp, so the id tie-breaker has to do its job
+    times = [datetime(2024, 5, day, tzinfo=timezone.utc) for day in range(1, 6)]
+    db = SessionLocal()
+    db.add_all([
+        PlantScan(id=f"page-{i:02d}", farmer_id="farmer-pages", disease_predicted="Tomato___healthy",
+                  confidence=0.9, created_at=times[i // 2])
+        for i in range(10)
+    ])
+    db.commit()
+    db.close()
+
+    seen, cursor = [], None
+    while True:
+        page = list_scans("farmer-pages", limit=3, cursor=cursor)
+        seen += [scan["id"] for scan in page["scans"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"page-{i:02d}" for i in reversed(range(10))]
\ No newline at end of file
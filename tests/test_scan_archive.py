@@ -0,0 +1,70 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+pytest.importorskip("pyarrow")
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.database import SessionLocal, create_tables
+from app.models.plant_scan import PlantScan
+from app.services.scan_archive import ARCHIVE_COLUMNS, ScanArchive
+from app.utils.geo import encode_geohash, prefix_ranges
+
+CUTOFF = datetime(2021, 1, 1, tzinfo=timezone.utc)
+LATITUDE, LONGITUDE = 17.385, 78.4867
+
+@pytest.fixture
+def archive(tmp_path):
+    create_tables()
+    db = SessionLocal()
+    db.add_all([
+        PlantScan(id=f"old-{i}", farmer_id="farmer-archive", disease_predicted="Tomato___Late_blight",
+                  confidence=0.8, latitude=LATITUDE, longitude=LONGITUDE,
+                  geohash=encode_geohash(LATITUDE, LONGITUDE), created_at=datetime(2020, 6, 1 + i, tzinfo=timezone.utc))
+        for i in range(4)
+    ])
+    db.commit()
+    db.close()
+    return ScanArchive(str(tmp_path / "archive"))
+
+def part_files(root):
+    return [name for _, _, names in os.walk(root) for name in names if name.startswith("part-")]
+
+def test_archive_records_cutoff(archive):
+    assert archive.cutoff() is None
+    assert archive.archive(CUTOFF, batch_size=10) == 4
+    assert archive.cutoff() == CUTOFF
+    assert archive.has_data()
+
+    # An earlier cutoff later on does not move the marker back
+    archive.archive(datetime(2019, 1, 1, tzinfo=timezone.utc), batch_size=10)
+    assert archive.cutoff() == CUTOFF
+
+def test_rerun_after_crash_leaves_no_duplicates(archive):
+    # Simulate a crash after the file was written but before the rows were deleted
+    db = SessionLocal()
+    rows = [dict(row) for row in db.execute(
+        select(*ARCHIVE_COLUMNS).where(PlantScan.farmer_id == "farmer-archive")
+    ).mappings()]
+    db.close()
+    for row in rows:
+        row["created_at"] = row["created_at"].replace(tzinfo=timezone.utc)
+    archive._write_partition(2020, 6, rows)
+
+    history = archive.farmer_history("farmer-archive", ["id"], limit=10)
+    assert sorted(scan["id"] for scan in history) == [f"old-{i}" for i in range(4)]
+    nearby = archive.nearby(datetime(2020, 1, 1, tzinfo=timezone.utc),
+                            prefix_ranges([encode_geohash(LATITUDE, LONGITUDE, 5)]),
+                            (LATITUDE - 1, LATITUDE + 1, LONGITUDE - 1, LONGITUDE + 1))
+    assert len(nearby) == 4
+
+    assert archive.archive(CUTOFF, batch_size=10) == 4
+    assert len(part_files(archive.root)) == 1
+
+def test_batches_stream_in_bounded_chunks(archive):
+    archive.archive(CUTOFF, batch_size=10)
+    batches = list(archive.batches(["id"], batch_size=3))
+    assert all(batch.num_rows <= 3 for batch in batches)
+    assert sorted(i for batch in batches for i in batch.column("id").to_pylist()) == [f"old-{i}" for i in range(4)]
\ No newline at end of file
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.database import SessionLocal, create_tables
+from app.models.plant_scan import PlantScan
+from app.services.scan_writer import ScanWriteBuffer
+
+@pytest.fixture(scope="module", autouse=True)
+def tables():
+    create_tables()
+
+@pytest.fixture
+def buffer():
+    return ScanWriteBuffer(max_batch=100, flush_interval=60, max_pending=10)
+
+def scan(**values):
+    return {"farmer_id": "farmer-1", "disease_predicted": "Tomato___healthy", "confidence": 0.9, **values}
+
+def stored(*scan_ids):
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.count()).where(PlantScan.id.in_(scan_ids))).scalar()
+    finally:
+        db.close()
+
+def test_bad_row_rejected_without_failing_the_batch(buffer):
+    good = [buffer.submit(scan()) for _ in range(5)]
+    bad = buffer.submit(scan(farmer_id=None))
+    good += [buffer.submit(scan()) for _ in range(2)]
+
+    assert buffer.flush() == 7
+    assert buffer.pending == 0
+    with pytest.raises(IntegrityError):
+        bad.result(timeout=0)
+    scan_ids = [future.result(timeout=0) for future in good]
+    assert stored(*scan_ids) == 7
+
+    # Later flushes are not poisoned by the rejected row
+    later = buffer.submit(scan())
+    assert buffer.flush() == 1
+    assert stored(later.result(timeout=0)) == 1
+
+def test_transient_error_requeues_batch(buffer, monkeypatch):
+    future = buffer.submit(scan())
+    write = buffer._write
+
+    def locked(batch):
+        monkeypatch.setattr(buffer, "_write", write)
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(buffer, "_write", locked)
+    assert buffer.flush() == 0
+    assert buffer.pending == 1
+    assert not future.done()
+
+    assert buffer.flush() == 1
+    assert stored(future.result(timeout=0)) == 1
+
+def test_resubmitted_id_is_written_once(buffer):
+    first = buffer.submit(scan(id="job-1"))
+    duplicate = buffer.submit(scan(id="job-1"))
+    assert buffer.flush() == 1
+
+    retry = buffer.submit(scan(id="job-1"))
+    assert buffer.flush() == 0
+    assert first.result(timeout=0) == duplicate.result(timeout=0) == retry.result(timeout=0) == "job-1"
+    assert stored("job-1") == 1
\ No newline at end of file
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from sqlalchemy import update
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.database import AsyncSessionLocal, SessionLocal, create_tables
+from app.core.security import (
+    PasswordHasher, TokenCache, create_access_token, get_token_cache, verify_token
+)
+from app.models.user import Farmer
+
+@pytest.fixture
+def farmer_id():
+    create_tables()
+    key = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        db.add(Farmer(id=f"farmer-{key}", phone=f"556{key}"))
+        db.commit()
+    finally:
+        db.close()
+    return f"farmer-{key}"
+
+def set_farmer(farmer_id, **values):
+    """Change a farmer the way another process would, behind this process's cache"""
+    db = SessionLocal()
+    try:
+        db.execute(update(Farmer).where(Farmer.id == farmer_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+    get_token_cache().clear()
+
+async def verify(token):
+    async with AsyncSessionLocal() as db:
+        return await verify_token(token, db)
+
+def test_revocation_and_deactivation_are_read_from_the_farmer(farmer_id):
+    token = create_access_token({"sub": farmer_id})
+    assert asyncio.run(verify(token))["sub"] == farmer_id
+
+    set_farmer(farmer_id, tokens_valid_after=int(time.time()))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(verify(token))
+    assert error.value.status_code == 401
+
+    set_farmer(farmer_id, tokens_valid_after=None, is_active=False)
+    with pytest.raises(HTTPException):
+        asyncio.run(verify(token))
+
+def test_subject_cutoff_includes_its_own_second():
+    cache = TokenCache(max_entries=10, ttl=60)
+    now = int(time.time())
+    cache.revoke_subject("farmer-1", now)
+
+    assert cache.is_revoked({"sub": "farmer-1", "iat": now - 1})
+    assert cache.is_revoked({"sub": "farmer-1", "iat": now})
+    assert not cache.is_revoked({"sub": "farmer-1", "iat": now + 1})
+    assert cache.is_revoked({"sub": "farmer-1"})
+    assert not cache.is_revoked({"sub": "farmer-2", "iat": now - 1})
+
+    # An older cutoff (e.g. read from the database) never moves it back
+    cache.revoke_subject("farmer-1", now - 10)
+    assert cache.is_revoked({"sub": "farmer-1", "iat": now})
+
+def bcrypt_context(rounds):
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds,
+                        bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds)
+
+@pytest.mark.parametrize("old_rounds, new_rounds", [(4, 5), (5, 4)])
+def test_other_work_factors_are_rehashed(old_rounds, new_rounds):
+    old_hash = bcrypt_context(old_rounds).hash("Secret#123")
+    verified, new_hash = bcrypt_context(new_rounds).verify_and_update("Secret#123", old_hash)
+    assert verified
+    assert new_hash is not None and new_hash.startswith(f"$2b${new_rounds:02d}$")
+
+def test_pending_hashes_released_when_they_finish_not_when_cancelled():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    async def cancel_while_hashing():
+        task = asyncio.ensure_future(hasher.run(slow))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_hashing())
+    assert hasher.in_flight == 1  # the thread is still hashing
+    release.set()
+    hasher.shutdown()
+    assert hasher.in_flight == 0
\ No newline at end of file
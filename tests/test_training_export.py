@@ -0,0 +1,23 @@
+import numpy as np
+
+from app.ml.training_export import ShardWriter, compact_shards, latest_examples, shard_paths
+
+def write_shard(writer, examples):
+    for scan_id, label in examples:
+        writer.add(np.zeros((2, 2, 3), np.uint8), None, label, scan_id, None)
+    writer.flush()
+
+def test_reexported_scans_keep_only_their_latest_label(tmp_path):
+    writer = ShardWriter(str(tmp_path), shard_size=2, first_shard=0)
+    write_shard(writer, [("a", "Tomato_healthy"), ("b", "Tomato_healthy")])
+    write_shard(writer, [("c", "Tomato_healthy")])
+    # Feedback on a and c was edited, so a later run exported them again
+    write_shard(writer, [("a", "Tomato_Late_blight"), ("c", "Tomato_Early_blight")])
+
+    latest = {scan_id: label for _, _, label, scan_id, _ in latest_examples(str(tmp_path))}
+    assert latest == {"a": "Tomato_Late_blight", "b": "Tomato_healthy", "c": "Tomato_Early_blight"}
+
+    assert compact_shards(str(tmp_path)) == 2
+    paths = shard_paths(str(tmp_path))
+    assert [np.load(path)["scan_ids"].tolist() for path in paths] == [["b"], ["a", "c"]]
+    assert compact_shards(str(tmp_path)) == 0
\ No newline at end of file